@@ -7,13 +7,17 @@ Configura servidores e clientes L2TP com IPv6
 import os
 import sys
 import logging
+from functools import lru_cache
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from typing import List, Tuple, Dict
 
 # Importar módulos
 from modules import (
     MikrotikConnection,
-    MikrotikL2TPManager
+    get_or_create_manager,
+    close_managers
 )
 
 # Configurar logging
@@ -27,127 +31,152 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def load_tunnel_mapping(filename: str = 'tunnel_mapping.txt') -> Dict[str, Dict]:
+# Registros dos arquivos de mapeamento
+TunnelCfg = namedtuple('TunnelCfg', 'client_hostname server_ip client_ip route_network gateway')
+ClientCfg = namedtuple('ClientCfg', 'bridge_interface bridge_ip gateway')
+
+# Número padrão de clientes configurados simultaneamente
+DEFAULT_CLIENT_CONCURRENCY = 16
+
+def _data_lines(data: bytes):
+    """
+    Gera (número da linha, linha sem espaços) a partir do conteúdo bruto do
+    arquivo, pulando linhas vazias e comentários; as linhas seguem em bytes
+    """
+    return (
+        (line_num, line)
+        for line_num, line in ((n, raw.strip()) for n, raw in enumerate(data.split(b'\n'), 1))
+        if line and line[:1] != b'#'
+    )
+
+def _load_cached(filename: str, parser):
+    """
+    Carrega arquivo via parser, reaproveitando o resultado enquanto o
+    arquivo não mudar (chave: caminho, st_mtime_ns, st_size)
+    """
+    try:
+        st = os.stat(filename)
+    except OSError:
+        # Arquivo inexistente/inacessível: o parser registra o erro
+        return parser(filename)
+    
+    # Cópia rasa: cada chamador recebe seu próprio dict/lista (registros são tuplas imutáveis)
+    return _load_cached_by_stat(os.path.abspath(filename), st.st_mtime_ns, st.st_size, parser).copy()
+
+@lru_cache(maxsize=None)
+def _load_cached_by_stat(path: str, mtime_ns: int, size: int, parser):
+    """Cache em memória do resultado do parser, válido enquanto o arquivo não mudar"""
+    return parser(path)
+
+def load_tunnel_mapping(filename: str = 'tunnel_mapping.txt') -> Dict[str, TunnelCfg]:
     """Carrega mapeamento de túneis"""
+    return _load_cached(filename, _parse_tunnel_mapping)
+
+def _parse_tunnel_mapping(filename: str) -> Dict[str, TunnelCfg]:
+    """Faz parse do arquivo de mapeamento de túneis"""
     mappings = {}
     
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                
-                if not line or line.startswith('#'):
-                    continue
-                
-                parts = line.split(',')
-                if len(parts) != 6:
-                    logger.warning(f"Linha {line_num} inválida em {filename}: {line}")
-                    continue
-                
-                tunnel_name, client_hostname, server_ip, client_ip, route_network, gateway = [p.strip() for p in parts]
-                
-                mappings[tunnel_name] = {
-                    'client_hostname': client_hostname,
-                    'server_ip': server_ip,
-                    'client_ip': client_ip,
-                    'route_network': route_network,
-                    'gateway': gateway
-                }
+        # Leitura única do arquivo; split e filtro de comentários em bytes
+        with open(filename, 'rb') as f:
+            data = f.read()
         
-        logger.info(f"📋 Carregados {len(mappings)} mapeamentos de túneis")
+        for line_num, line in _data_lines(data):
+            parts = line.split(b',', 5)
+            if len(parts) != 6:
+                logger.warning("Linha %d inválida em %s: %s", line_num, filename, line.decode('utf-8', errors='replace'))
+                continue
+            
+            mappings[parts[0].strip().decode('utf-8')] = TunnelCfg._make(part.strip().decode('utf-8') for part in parts[1:])
+        
+        logger.info("📋 Carregados %s mapeamentos de túneis", len(mappings))
         return mappings
         
     except FileNotFoundError:
-        logger.error(f"❌ Arquivo {filename} não encontrado")
+        logger.error("❌ Arquivo %s não encontrado", filename)
         return {}
     except Exception as e:
-        logger.error(f"❌ Erro ao carregar {filename}: {e}")
+        logger.error("❌ Erro ao carregar %s: %s", filename, e)
         return {}
 
-def load_client_mapping(filename: str = 'client_ipv6_mapping.txt') -> Dict[str, Dict]:
+def load_client_mapping(filename: str = 'client_ipv6_mapping.txt') -> Dict[str, ClientCfg]:
     """Carrega mapeamento de clientes"""
+    return _load_cached(filename, _parse_client_mapping)
+
+def _parse_client_mapping(filename: str) -> Dict[str, ClientCfg]:
+    """Faz parse do arquivo de mapeamento de clientes"""
     mappings = {}
     
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                
-                if not line or line.startswith('#'):
-                    continue
-                
-                parts = line.split(',')
-                if len(parts) != 4:
-                    logger.warning(f"Linha {line_num} inválida em {filename}: {line}")
-                    continue
-                
-                hostname, bridge_interface, bridge_ip, gateway = [p.strip() for p in parts]
-                
-                mappings[hostname] = {
-                    'bridge_interface': bridge_interface,
-                    'bridge_ip': bridge_ip,
-                    'gateway': gateway
-                }
+        # Leitura única do arquivo; split e filtro de comentários em bytes
+        with open(filename, 'rb') as f:
+            data = f.read()
+        
+        for line_num, line in _data_lines(data):
+            parts = line.split(b',', 3)
+            if len(parts) != 4:
+                logger.warning("Linha %d inválida em %s: %s", line_num, filename, line.decode('utf-8', errors='replace'))
+                continue
+            
+            mappings[parts[0].strip().decode('utf-8')] = ClientCfg._make(part.strip().decode('utf-8') for part in parts[1:])
         
-        logger.info(f"📋 Carregados {len(mappings)} mapeamentos de clientes")
+        logger.info("📋 Carregados %s mapeamentos de clientes", len(mappings))
         return mappings
         
     except FileNotFoundError:
-        logger.error(f"❌ Arquivo {filename} não encontrado")
+        logger.error("❌ Arquivo %s não encontrado", filename)
         return {}
     except Exception as e:
-        logger.error(f"❌ Erro ao carregar {filename}: {e}")
+        logger.error("❌ Erro ao carregar %s: %s", filename, e)
         return {}
 
 def load_hosts(filename: str) -> List[Tuple[str, str, str]]:
     """Carrega lista de hosts"""
+    return _load_cached(filename, _parse_hosts)
+
+def _parse_hosts(filename: str) -> List[Tuple[str, str, str]]:
+    """Faz parse do arquivo de hosts"""
     hosts = []
     
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                
-                if not line or line.startswith('#'):
-                    continue
-                
-                parts = line.split(',')
-                if len(parts) != 3:
-                    logger.warning(f"Linha {line_num} inválida em {filename}: {line}")
-                    continue
-                
-                ip, hostname, method = [part.strip() for part in parts]
-                hosts.append((ip, hostname, method))
+        # Leitura única do arquivo; split e filtro de comentários em bytes
+        with open(filename, 'rb') as f:
+            data = f.read()
+        
+        for line_num, line in _data_lines(data):
+            parts = line.split(b',', 2)
+            if len(parts) != 3:
+                logger.warning("Linha %d inválida em %s: %s", line_num, filename, line.decode('utf-8', errors='replace'))
+                continue
+            
+            hosts.append(tuple(part.strip().decode('utf-8') for part in parts))
         
-        logger.info(f"📋 Carregados {len(hosts)} hosts de {filename}")
+        logger.info("📋 Carregados %s hosts de %s", len(hosts), filename)
         return hosts
         
     except FileNotFoundError:
-        logger.error(f"❌ Arquivo {filename} não encontrado")
+        logger.error("❌ Arquivo %s não encontrado", filename)
         return []
     except Exception as e:
-        logger.error(f"❌ Erro ao carregar {filename}: {e}")
+        logger.error("❌ Erro ao carregar %s: %s", filename, e)
         return []
 
 def configure_l2tp_server(username: str, password: str, host: str, 
-                         tunnel_mappings: Dict[str, Dict]) -> bool:
+                         tunnel_mappings: Dict[str, TunnelCfg]) -> bool:
     """Configura servidor L2TP"""
     
-    logger.info(f"🖥️  Configurando servidor L2TP: {host}")
-    
-    connection = MikrotikConnection(username, password)
+    logger.info("🖥️  Configurando servidor L2TP: %s", host)
     
     try:
-        # Conectar ao servidor
-        if not connection.connect_ssh(host):
-            logger.error(f"❌ Falha na conexão SSH com servidor {host}")
+        # Conectar ao servidor (manager e conexão reaproveitados entre chamadas)
+        l2tp_manager = get_or_create_manager(host, username, password)
+        if l2tp_manager is None:
+            logger.error("❌ Falha na conexão SSH com servidor %s", host)
             return False
         
-        l2tp_manager = MikrotikL2TPManager(connection)
-        
         # Listar túneis existentes
         tunnels = l2tp_manager.list_l2tp_server_tunnels()
-        logger.info(f"📡 Encontrados {len(tunnels)} túneis ativos no servidor")
+        logger.info("📡 Encontrados %s túneis ativos no servidor", len(tunnels))
         
         success_count = 0
         total_count = 0
@@ -156,85 +185,99 @@ def configure_l2tp_server(username: str, password: str, host: str,
         for tunnel_name, config in tunnel_mappings.items():
             total_count += 1
             
-            logger.info(f"🔧 Configurando túnel: {tunnel_name}")
+            logger.info("🔧 Configurando túnel: %s", tunnel_name)
             
             success = l2tp_manager.configure_l2tp_server_tunnel(
                 tunnel_name=tunnel_name,
-                server_ip=config['server_ip'],
-                client_ip=config['client_ip'],
-                route_network=config['route_network'],
-                route_gateway=config['gateway']
+                server_ip=config.server_ip,
+                client_ip=config.client_ip,
+                route_network=config.route_network,
+                route_gateway=config.gateway
             )
             
             if success:
                 success_count += 1
-                logger.info(f"✅ Túnel {tunnel_name} configurado com sucesso")
+                logger.info("✅ Túnel %s configurado com sucesso", tunnel_name)
             else:
-                logger.error(f"❌ Falha ao configurar túnel {tunnel_name}")
+                logger.error("❌ Falha ao configurar túnel %s", tunnel_name)
         
-        logger.info(f"📊 Servidor L2TP: {success_count}/{total_count} túneis configurados")
+        logger.info("📊 Servidor L2TP: %s/%s túneis configurados", success_count, total_count)
         return success_count == total_count
         
     except Exception as e:
-        logger.error(f"❌ Erro no servidor L2TP {host}: {e}")
+        logger.error("❌ Erro no servidor L2TP %s: %s", host, e)
         return False
+
+def _configure_one_client(host_ip: str, hostname: str, method: str, username: str,
+                          password: str, config: ClientCfg) -> bool:
+    """Configura um único cliente L2TP (executado em thread do pool)"""
+    
+    logger.info("🔧 Configurando cliente: %s (%s)", hostname, host_ip)
+    
+    try:
+        # Conectar ao cliente
+        l2tp_manager = get_or_create_manager(host_ip, username, password, method)
+        if l2tp_manager is None:
+            logger.error("❌ Falha na conexão com cliente %s", hostname)
+            return False
         
-    finally:
-        connection.disconnect()
+        # Configurar cliente
+        return l2tp_manager.configure_l2tp_client(
+            bridge_interface=config.bridge_interface,
+            bridge_ip=config.bridge_ip,
+            default_gateway=config.gateway
+        )
+        
+    except Exception as e:
+        logger.error("❌ Erro no cliente %s: %s", hostname, e)
+        return False
+
+def _client_concurrency() -> int:
+    """Lê L2TP_CLIENT_CONCURRENCY, usando o padrão se vazio ou inválido (mínimo 1)"""
+    value = os.getenv('L2TP_CLIENT_CONCURRENCY', '').strip()
+    if not value:
+        return DEFAULT_CLIENT_CONCURRENCY
+    
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning("⚠️  L2TP_CLIENT_CONCURRENCY inválido (%r), usando %s", value, DEFAULT_CLIENT_CONCURRENCY)
+        return DEFAULT_CLIENT_CONCURRENCY
 
 def configure_l2tp_clients(username: str, password: str, client_hosts: List[Tuple[str, str, str]], 
-                          client_mappings: Dict[str, Dict]) -> Tuple[int, int]:
-    """Configura clientes L2TP"""
+                          client_mappings: Dict[str, ClientCfg]) -> Tuple[int, int]:
+    """Configura clientes L2TP em paralelo (L2TP_CLIENT_CONCURRENCY workers)"""
     
-    logger.info(f"👥 Configurando {len(client_hosts)} clientes L2TP")
+    logger.info("👥 Configurando %s clientes L2TP", len(client_hosts))
     
     success_count = 0
     total_count = len(client_hosts)
+    max_workers = _client_concurrency()
     
-    for host_ip, hostname, method in client_hosts:
-        logger.info(f"🔧 Configurando cliente: {hostname} ({host_ip})")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
         
-        # Verificar se existe mapeamento para este cliente
-        if hostname not in client_mappings:
-            logger.warning(f"⚠️  Mapeamento não encontrado para {hostname}")
-            continue
-        
-        config = client_mappings[hostname]
-        connection = MikrotikConnection(username, password)
-        
-        try:
-            # Conectar ao cliente
-            if method.lower() == 'ssh':
-                success = connection.connect_ssh(host_ip)
-            else:
-                success = connection.connect_telnet(host_ip)
-            
-            if not success:
-                logger.error(f"❌ Falha na conexão com cliente {hostname}")
+        for host_ip, hostname, method in client_hosts:
+            # Verificar se existe mapeamento para este cliente
+            if hostname not in client_mappings:
+                logger.warning("⚠️  Mapeamento não encontrado para %s", hostname)
                 continue
             
-            l2tp_manager = MikrotikL2TPManager(connection)
-            
-            # Configurar cliente
-            success = l2tp_manager.configure_l2tp_client(
-                bridge_interface=config['bridge_interface'],
-                bridge_ip=config['bridge_ip'],
-                default_gateway=config['gateway']
-            )
+            future = executor.submit(_configure_one_client, host_ip, hostname, method,
+                                     username, password, client_mappings[hostname])
+            futures[future] = hostname
+        
+        # Resultados na ordem de chegada
+        for future in as_completed(futures):
+            hostname = futures[future]
             
-            if success:
+            if future.result():
                 success_count += 1
-                logger.info(f"✅ Cliente {hostname} configurado com sucesso")
+                logger.info("✅ Cliente %s configurado com sucesso", hostname)
             else:
-                logger.error(f"❌ Falha ao configurar cliente {hostname}")
-                
-        except Exception as e:
-            logger.error(f"❌ Erro no cliente {hostname}: {e}")
-            
-        finally:
-            connection.disconnect()
+                logger.error("❌ Falha ao configurar cliente %s", hostname)
     
-    logger.info(f"📊 Clientes L2TP: {success_count}/{total_count} configurados")
+    logger.info("📊 Clientes L2TP: %s/%s configurados", success_count, total_count)
     return success_count, total_count
 
 def main():
@@ -272,34 +315,39 @@ def main():
     print(f"👥 Clientes L2TP: {len(client_hosts)}")
     print("-" * 60)
     
-    # 1. Configurar servidor L2TP
-    print("\n🖥️  CONFIGURANDO SERVIDOR L2TP")
-    print("-" * 40)
-    
-    server_success = configure_l2tp_server(username, password, server_host, tunnel_mappings)
-    
-    # 2. Configurar clientes L2TP
-    print("\n👥 CONFIGURANDO CLIENTES L2TP")
-    print("-" * 40)
-    
-    client_success_count, client_total = configure_l2tp_clients(username, password, client_hosts, client_mappings)
-    
-    # Relatório final
-    print("\n" + "=" * 60)
-    print("📊 RELATÓRIO FINAL L2TP")
-    print("=" * 60)
-    print(f"Servidor L2TP: {'✅ Sucesso' if server_success else '❌ Erro'}")
-    print(f"Clientes configurados: {client_success_count}/{client_total}")
-    print(f"Taxa de sucesso clientes: {(client_success_count/client_total)*100:.1f}%")
-    
-    overall_success = server_success and (client_success_count == client_total)
+    try:
+        # 1. Configurar servidor L2TP
+        print("\n🖥️  CONFIGURANDO SERVIDOR L2TP")
+        print("-" * 40)
+        
+        server_success = configure_l2tp_server(username, password, server_host, tunnel_mappings)
+        
+        # 2. Configurar clientes L2TP
+        print("\n👥 CONFIGURANDO CLIENTES L2TP")
+        print("-" * 40)
+        
+        client_success_count, client_total = configure_l2tp_clients(username, password, client_hosts, client_mappings)
+        
+        # Relatório final
+        print("\n" + "=" * 60)
+        print("📊 RELATÓRIO FINAL L2TP")
+        print("=" * 60)
+        print(f"Servidor L2TP: {'✅ Sucesso' if server_success else '❌ Erro'}")
+        print(f"Clientes configurados: {client_success_count}/{client_total}")
+        print(f"Taxa de sucesso clientes: {(client_success_count/client_total)*100:.1f}%")
+        
+        overall_success = server_success and (client_success_count == client_total)
+        
+        if overall_success:
+            print("🎉 Configuração L2TP concluída com sucesso!")
+            sys.exit(0)
+        else:
+            print("⚠️  Configuração L2TP concluída com alguns erros.")
+            sys.exit(1)
     
-    if overall_success:
-        print("🎉 Configuração L2TP concluída com sucesso!")
-        sys.exit(0)
-    else:
-        print("⚠️  Configuração L2TP concluída com alguns erros.")
-        sys.exit(1)
+    finally:
+        close_managers()
+        MikrotikConnection.shutdown_pool()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -7,8 +7,9 @@ from .mikrotik_connection import MikrotikConnection
 from .mikrotik_interfaces import MikrotikInterfaces
 from .mikrotik_ipv6_config import MikrotikIPv6Config
 from .mikrotik_routes import MikrotikRoutes
-from .mikrotik_l2tp_manager import MikrotikL2TPManager
+from .mikrotik_l2tp_manager import MikrotikL2TPManager, get_or_create_manager, close_managers
 from .mikrotik_connectivity_tests import MikrotikConnectivityTests
+from .mikrotik_api import MikrotikAPI, MikrotikAPIError
 
 __all__ = [
     'MikrotikConnection',
@@ -16,5 +17,9 @@ __all__ = [
     'MikrotikIPv6Config',
     'MikrotikRoutes',
     'MikrotikL2TPManager',
-    'MikrotikConnectivityTests'
+    'MikrotikConnectivityTests',
+    'MikrotikAPI',
+    'MikrotikAPIError',
+    'get_or_create_manager',
+    'close_managers'
 ] 
\ No newline at end of file
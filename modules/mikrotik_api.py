@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Módulo de API RouterOS - Mikrotik Automation
+Acesso opcional à API nativa do RouterOS (api-ssl, porta 8729) via librouteros
+"""
+
+import os
+import ssl
+import socket
+import logging
+from functools import partial
+from typing import Dict, List
+
+try:
+    import librouteros
+    from librouteros.exceptions import TrapError
+except ImportError:  # librouteros é opcional: sem ela, apenas o CLI é usado
+    librouteros = None
+    TrapError = None
+
+logger = logging.getLogger(__name__)
+
+# Serviço api-ssl: credenciais nunca trafegam em texto puro
+API_PORT = 8729
+# Timeout (segundos) apenas para abrir a conexão, separado do timeout dos comandos
+API_CONNECT_TIMEOUT = 3
+API_AVAILABLE = librouteros is not None
+
+def api_enabled() -> bool:
+    """
+    Indica se o uso da API foi habilitado (MIKROTIK_USE_API=true no .env)
+    
+    Returns:
+        bool: True se a librouteros está instalada e a API foi habilitada
+    """
+    return API_AVAILABLE and os.getenv('MIKROTIK_USE_API', '').strip().lower() in ('1', 'true', 'yes')
+
+def _ssl_context() -> ssl.SSLContext:
+    """Contexto TLS do api-ssl (MIKROTIK_API_SSL_VERIFY=false aceita certificado autoassinado)"""
+    context = ssl.create_default_context()
+    if os.getenv('MIKROTIK_API_SSL_VERIFY', 'true').strip().lower() in ('0', 'false', 'no'):
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+class MikrotikAPIError(Exception):
+    """Erro (trap) retornado pelo RouterOS a um comando da API"""
+    
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+class MikrotikAPI:
+    """Sessão da API RouterOS, com respostas já estruturadas em dicionários"""
+    
+    def __init__(self, username: str, password: str):
+        self.username = username
+        self.password = password
+        self.api = None
+        self.host = None
+    
+    def connect(self, host: str, port: int = API_PORT, timeout: int = 30) -> bool:
+        """
+        Conecta ao serviço api-ssl do dispositivo
+        
+        Args:
+            host: IP ou hostname do dispositivo
+            port: Porta do api-ssl (padrão: 8729)
+            timeout: Timeout dos comandos em segundos
+        
+        Returns:
+            bool: True se conectou com sucesso, False caso contrário
+        """
+        if not api_enabled():
+            return False
+        
+        try:
+            # Porta filtrada falha rápido, sem esperar o timeout dos comandos
+            socket.create_connection((host, port), timeout=API_CONNECT_TIMEOUT).close()
+            
+            wrapper = partial(_ssl_context().wrap_socket, server_hostname=host)
+            self.api = librouteros.connect(host=host, username=self.username, password=self.password,
+                                           port=port, timeout=timeout, ssl_wrapper=wrapper)
+            self.host = host
+            logger.info("✅ Conectado via API (api-ssl) a %s", host)
+            return True
+        
+        except Exception as e:
+            logger.warning("⚠️  API RouterOS indisponível em %s: %s", host, e)
+            self.api = None
+            return False
+    
+    def call(self, path: str, *queries: str, **params) -> List[Dict[str, object]]:
+        """
+        Executa um comando da API
+        
+        Args:
+            path: Caminho do comando (ex: /ipv6/route/print)
+            queries: Palavras de consulta já formatadas (ex: ?dst-address=::/0)
+            params: Atributos do comando (ex: **{'dst-address': '::/0'})
+        
+        Returns:
+            List[Dict]: Registros retornados pelo dispositivo
+        
+        Raises:
+            MikrotikAPIError: Se o RouterOS responder com erro (trap)
+        """
+        words = [f"={key}={self._format_value(value)}" for key, value in params.items()]
+        words.extend(queries)
+        
+        try:
+            return list(self.api.rawCmd(path, *words))
+        except TrapError as e:
+            raise MikrotikAPIError(e.message) from e
+    
+    def _format_value(self, value) -> str:
+        """Converte valores Python para o formato da API"""
+        if isinstance(value, bool):
+            return "yes" if value else "no"
+        return str(value)
+    
+    def is_connected(self) -> bool:
+        """Verifica se a sessão da API está aberta"""
+        return self.api is not None
+    
+    def close(self):
+        """Fecha a sessão da API"""
+        if self.api:
+            try:
+                self.api.close()
+            except Exception:
+                pass
+            finally:
+                self.api = None
+                self.host = None 
\ No newline at end of file
@@ -5,24 +5,212 @@ Responsável por gerenciar conexões SSH e Telnet com dispositivos Mikrotik
 """
 
 import os
+import re
 import time
 import socket
-import telnetlib
+import asyncio
+import itertools
+import threading
 import paramiko
 import logging
-from typing import Union, Optional
+from typing import Union, Optional, Dict, List, Tuple
+from .mikrotik_api import API_PORT, MikrotikAPI, MikrotikAPIError, api_enabled
 
 logger = logging.getLogger(__name__)
 
+# Tempo máximo (segundos) que uma sessão SSH ociosa permanece no pool
+POOL_IDLE_TIMEOUT = 300
+
+# Prompt do terminal RouterOS, ex: [admin@MikroTik] >
+_PROMPT_RE = re.compile(r'\[[^\]]+\] >\s*$')
+_PROMPT_LINE_RE = re.compile(r'^\s*\[[^\]]+\] >')
+
+# Sequências de escape ANSI emitidas pelo terminal RouterOS
+_ANSI_RE = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]|\x1b[=>]')
+
+# Comando print de menu (ex: /ipv6 route print where ...), paginado no console interativo
+_PRINT_CMD_RE = re.compile(r'^(\s*/[\w\s/-]*?\bprint)(?=\s|$)')
+
+# Algoritmos SSH preferidos na negociação: baratos para a CPU do RouterOS
+_PREFERRED_CIPHERS = ('aes128-ctr',)
+_PREFERRED_DIGESTS = ('hmac-sha2-256',)
+
+class _TransportClient:
+    """Adaptador mínimo sobre paramiko.Transport com a interface usada do SSHClient"""
+    
+    def __init__(self, transport: paramiko.Transport):
+        self._transport = transport
+    
+    def get_transport(self) -> paramiko.Transport:
+        return self._transport
+    
+    def exec_command(self, command: str, bufsize: int = -1, timeout: Optional[float] = None):
+        channel = self._transport.open_session(timeout=timeout)
+        channel.settimeout(timeout)
+        channel.exec_command(command)
+        
+        stdin = channel.makefile_stdin('wb', bufsize)
+        stdout = channel.makefile('r', bufsize)
+        stderr = channel.makefile_stderr('r', bufsize)
+        return stdin, stdout, stderr
+    
+    def invoke_shell(self, term: str = 'vt100', width: int = 80, height: int = 24) -> paramiko.Channel:
+        channel = self._transport.open_session()
+        channel.get_pty(term, width, height)
+        channel.invoke_shell()
+        return channel
+    
+    def close(self):
+        self._transport.close()
+
+def _prefer(available: Tuple[str, ...], preferred: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Move os algoritmos preferidos para o início, mantendo os demais como fallback"""
+    return tuple(a for a in preferred if a in available) + tuple(a for a in available if a not in preferred)
+
+# Bytes de controle do protocolo Telnet (RFC 854)
+_IAC, _DONT, _DO, _WONT, _WILL, _SB, _SE = 255, 254, 253, 252, 251, 250, 240
+
+class _TelnetProtocol(asyncio.Protocol):
+    """Protocolo Telnet mínimo: recusa todas as opções e acumula os dados recebidos"""
+    
+    def __init__(self):
+        self.transport = None
+        self.buffer = bytearray()
+        self.eof = False
+        self._pending = b""
+        self._data_event = asyncio.Event()
+    
+    def connection_made(self, transport):
+        self.transport = transport
+    
+    def data_received(self, data: bytes):
+        data = self._pending + data
+        self._pending = b""
+        
+        i, n = 0, len(data)
+        while i < n:
+            idx = data.find(_IAC, i)
+            if idx < 0:
+                self.buffer += data[i:]
+                break
+            
+            self.buffer += data[i:idx]
+            if idx + 1 >= n:
+                self._pending = data[idx:]
+                break
+            
+            cmd = data[idx + 1]
+            if cmd == _IAC:
+                # IAC escapado: byte 255 literal
+                self.buffer.append(_IAC)
+                i = idx + 2
+            elif cmd in (_DO, _DONT, _WILL, _WONT):
+                if idx + 2 >= n:
+                    self._pending = data[idx:]
+                    break
+                option = data[idx + 2]
+                # Mesma política do telnetlib: recusar todas as opções
+                if cmd == _DO:
+                    self.transport.write(bytes((_IAC, _WONT, option)))
+                elif cmd == _WILL:
+                    self.transport.write(bytes((_IAC, _DONT, option)))
+                i = idx + 3
+            elif cmd == _SB:
+                end = data.find(bytes((_IAC, _SE)), idx + 2)
+                if end < 0:
+                    self._pending = data[idx:]
+                    break
+                i = end + 2
+            else:
+                i = idx + 2
+        
+        self._data_event.set()
+    
+    def connection_lost(self, exc):
+        self.eof = True
+        self._data_event.set()
+    
+    async def read_until(self, marker: bytes, timeout: float) -> bytes:
+        """Lê até o marcador (inclusive), EOF ou timeout, como telnetlib.read_until"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        start = 0
+        
+        while True:
+            idx = self.buffer.find(marker, start)
+            if idx >= 0:
+                end = idx + len(marker)
+                data = bytes(self.buffer[:end])
+                del self.buffer[:end]
+                return data
+            
+            remaining = deadline - loop.time()
+            if self.eof or remaining <= 0:
+                data = bytes(self.buffer)
+                self.buffer.clear()
+                return data
+            
+            start = max(0, len(self.buffer) - len(marker))
+            self._data_event.clear()
+            try:
+                await asyncio.wait_for(self._data_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+class _TelnetSession:
+    """Sessão Telnet síncrona sobre um event loop asyncio privado"""
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop, protocol: _TelnetProtocol):
+        self._loop = loop
+        self._protocol = protocol
+    
+    def write(self, data: bytes):
+        self._protocol.transport.write(data.replace(bytes((_IAC,)), bytes((_IAC, _IAC))))
+    
+    def read_until(self, marker: bytes, timeout: float) -> bytes:
+        return self._loop.run_until_complete(self._protocol.read_until(marker, timeout))
+    
+    def drain(self):
+        """Descarta os dados já recebidos sem bloquear e sem levantar exceção"""
+        self._loop.run_until_complete(asyncio.sleep(0))
+        self._protocol.buffer.clear()
+    
+    @property
+    def closed(self) -> bool:
+        return self._protocol.eof
+    
+    def close(self):
+        if not self._loop.is_closed():
+            self._protocol.transport.close()
+            self._loop.run_until_complete(asyncio.sleep(0))
+            self._loop.close()
+
 class MikrotikConnection:
     """Classe para gerenciar conexões com dispositivos Mikrotik"""
     
-    def __init__(self, username: str, password: str):
+    # Pool de sessões SSH compartilhado entre instâncias, chave (host, porta, usuário)
+    _pool: Dict[Tuple[str, int, str], _TransportClient] = {}
+    _pool_last_used: Dict[Tuple[str, int, str], float] = {}
+    _pool_lock = threading.Lock()
+    # Uma reconexão por vez para cada chave do pool
+    _reconnect_locks: Dict[Tuple[str, int, str], threading.Lock] = {}
+    
+    def __init__(self, username: str, password: str, use_shell: bool = True):
         self.username = username
         self.password = password
+        self.use_shell = use_shell
         self.connection = None
         self.connection_type = None
         self.host = None
+        self.port = None
+        self.timeout = None
+        self._shell = None
+        self._shell_lock = threading.Lock()
+        self._shell_pending = bytearray()
+        self._shell_tokens = itertools.count()
+        self._api = None
+        self._api_tried = False
+        self._api_lock = threading.Lock()
         
     def connect_ssh(self, host: str, port: int = 22, timeout: int = 30) -> bool:
         """
@@ -36,38 +224,40 @@ class MikrotikConnection:
         Returns:
             bool: True se conectou com sucesso, False caso contrário
         """
+        key = (host, port, self.username)
+        
         try:
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            ssh.connect(
-                hostname=host,
-                port=port,
-                username=self.username,
-                password=self.password,
-                timeout=timeout,
-                look_for_keys=False,
-                allow_agent=False,
-                banner_timeout=30
-            )
+            ssh = self._get_pooled_client(key)
+            
+            if ssh:
+                logger.info("♻️  Reutilizando sessão SSH com %s", host)
+            else:
+                ssh = self._add_pooled_client(key, self._open_transport(host, port, timeout))
+                
+                logger.info("✅ Conectado via SSH a %s", host)
             
             self.connection = ssh
             self.connection_type = 'ssh'
             self.host = host
+            self.port = port
+            self.timeout = timeout
+            
+            if self.use_shell:
+                self._open_shell(timeout)
             
-            logger.info(f"✅ Conectado via SSH a {host}")
             return True
             
         except paramiko.AuthenticationException:
-            logger.error(f"❌ Erro de autenticação SSH para {host}")
+            logger.error("❌ Erro de autenticação SSH para %s", host)
             return False
         except paramiko.SSHException as e:
-            logger.error(f"❌ Erro SSH para {host}: {e}")
+            logger.error("❌ Erro SSH para %s: %s", host, e)
             return False
         except socket.timeout:
-            logger.error(f"❌ Timeout na conexão SSH para {host}")
+            logger.error("❌ Timeout na conexão SSH para %s", host)
             return False
         except Exception as e:
-            logger.error(f"❌ Erro inesperado SSH para {host}: {e}")
+            logger.error("❌ Erro inesperado SSH para %s: %s", host, e)
             return False
     
     def connect_telnet(self, host: str, port: int = 23, timeout: int = 30) -> bool:
@@ -83,38 +273,98 @@ class MikrotikConnection:
             bool: True se conectou com sucesso, False caso contrário
         """
         try:
-            tn = telnetlib.Telnet(host, port, timeout)
-            
-            # Aguardar prompt de login
-            tn.read_until(b"Login: ", timeout)
-            tn.write(self.username.encode('ascii') + b"\n")
-            
-            # Aguardar prompt de senha
-            tn.read_until(b"Password: ", timeout)
-            tn.write(self.password.encode('ascii') + b"\n")
-            
-            # Verificar se logou com sucesso (aguardar prompt)
-            response = tn.read_until(b">", timeout).decode('utf-8', errors='ignore')
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            logger.error("❌ connect_telnet chamado dentro de um event loop ativo; use _connect_telnet_async para %s", host)
+            return False
+        
+        loop = asyncio.new_event_loop()
+        
+        try:
+            protocol = loop.run_until_complete(self._connect_telnet_async(host, port, timeout))
             
-            if ">" in response or "]" in response:
-                self.connection = tn
+            if protocol:
+                self.connection = _TelnetSession(loop, protocol)
                 self.connection_type = 'telnet'
                 self.host = host
                 
-                logger.info(f"✅ Conectado via Telnet a {host}")
+                logger.info("✅ Conectado via Telnet a %s", host)
                 return True
             else:
-                logger.error(f"❌ Falha na autenticação Telnet para {host}")
-                tn.close()
+                logger.error("❌ Falha na autenticação Telnet para %s", host)
+                loop.close()
                 return False
                 
-        except socket.timeout:
-            logger.error(f"❌ Timeout na conexão Telnet para {host}")
+        except (socket.timeout, asyncio.TimeoutError):
+            logger.error("❌ Timeout na conexão Telnet para %s", host)
+            loop.close()
             return False
         except Exception as e:
-            logger.error(f"❌ Erro Telnet para {host}: {e}")
+            logger.error("❌ Erro Telnet para %s: %s", host, e)
+            loop.close()
             return False
     
+    async def _connect_telnet_async(self, host: str, port: int, timeout: int) -> Optional[_TelnetProtocol]:
+        """
+        Abre a conexão Telnet e faz login no event loop corrente
+        
+        Returns:
+            _TelnetProtocol: Protocolo autenticado ou None se o login falhou
+        """
+        loop = asyncio.get_running_loop()
+        transport, protocol = await asyncio.wait_for(
+            loop.create_connection(_TelnetProtocol, host, port), timeout
+        )
+        
+        try:
+            # Aguardar prompt de login
+            await protocol.read_until(b"Login: ", timeout)
+            transport.write(self.username.encode('ascii') + b"\n")
+            
+            # Aguardar prompt de senha
+            await protocol.read_until(b"Password: ", timeout)
+            transport.write(self.password.encode('ascii') + b"\n")
+            
+            # Verificar se logou com sucesso (aguardar prompt)
+            response = (await protocol.read_until(b">", timeout)).decode('utf-8', errors='ignore')
+            
+            if ">" in response or "]" in response:
+                return protocol
+        
+        except BaseException:
+            transport.close()
+            raise
+        
+        transport.close()
+        return None
+    
+    def _open_transport(self, host: str, port: int, timeout: int) -> _TransportClient:
+        """
+        Abre transporte SSH direto, sem compressão e preferindo aes128-ctr +
+        hmac-sha2-256 (algoritmos não suportados pelo dispositivo ficam como fallback)
+        """
+        sock = socket.create_connection((host, port), timeout)
+        transport = paramiko.Transport(sock)
+        
+        try:
+            transport.banner_timeout = 30
+            transport.use_compression(False)
+            
+            options = transport.get_security_options()
+            options.ciphers = _prefer(options.ciphers, _PREFERRED_CIPHERS)
+            options.digests = _prefer(options.digests, _PREFERRED_DIGESTS)
+            
+            transport.start_client(timeout=timeout)
+            transport.auth_password(self.username, self.password)
+            
+        except BaseException:
+            transport.close()
+            raise
+        
+        return _TransportClient(transport)
+    
     def execute_command(self, command: str, timeout: int = 30) -> Optional[str]:
         """
         Executa um comando no dispositivo conectado
@@ -126,66 +376,479 @@ class MikrotikConnection:
         Returns:
             str: Saída do comando ou None em caso de erro
         """
+        return self._run_command(command, timeout, self._execute_ssh_command, self._execute_telnet_command)
+    
+    def execute_command_bytes(self, command: str, timeout: int = 30) -> Optional[bytes]:
+        """
+        Executa um comando e retorna a saída sem decodificar
+        
+        Via SSH o comando roda sempre em um canal exec, cujos bytes são devolvidos
+        como estão, evitando decodificar saídas grandes (ex: ping) só para procurar padrões.
+        
+        Args:
+            command: Comando RouterOS a ser executado
+            timeout: Timeout do comando em segundos
+            
+        Returns:
+            bytes: Saída do comando ou None em caso de erro
+        """
+        return self._run_command(command, timeout, self._execute_ssh_command_bytes,
+                                 lambda cmd, tmo: self._execute_telnet_command(cmd, tmo).encode('utf-8'))
+    
+    def _run_command(self, command: str, timeout: int, ssh_runner, telnet_runner):
+        """Despacha o comando para SSH (com uma reconexão) ou Telnet"""
         if not self.connection:
             logger.error("❌ Nenhuma conexão ativa")
             return None
         
         try:
             if self.connection_type == 'ssh':
-                return self._execute_ssh_command(command, timeout)
+                try:
+                    return ssh_runner(command, timeout)
+                except paramiko.SSHException as e:
+                    # Sessão do pool pode ter caído: reconectar uma única vez
+                    logger.warning("⚠️  Sessão SSH com %s perdida (%s), reconectando...", self.host, e)
+                    if not self._reconnect_ssh():
+                        return None
+                    return ssh_runner(command, timeout)
             else:
-                return self._execute_telnet_command(command, timeout)
+                return telnet_runner(command, timeout)
                 
         except Exception as e:
-            logger.error(f"❌ Erro ao executar comando '{command}': {e}")
+            logger.error("❌ Erro ao executar comando '%s': %s", command, e)
             return None
     
+    def execute_commands(self, commands: List[str], timeout: int = 30) -> List[Optional[str]]:
+        """
+        Executa vários comandos RouterOS com uma única escrita no canal
+        
+        Args:
+            commands: Lista de comandos RouterOS
+            timeout: Timeout de cada comando em segundos
+            
+        Returns:
+            List[str]: Saída de cada comando, na mesma ordem (None em caso de erro)
+        """
+        if not self.connection:
+            logger.error("❌ Nenhuma conexão ativa")
+            return [None] * len(commands)
+        
+        if not commands:
+            return []
+        
+        # Canal shell: lote em uma única escrita, um lote por vez (aguarda o shell se ocupado)
+        if self.connection_type == 'ssh' and self._shell is not None:
+            with self._shell_lock:
+                try:
+                    if self._shell is not None:
+                        self._touch_pool()
+                        return self._execute_shell_batch(commands, timeout)
+                        
+                except Exception as e:
+                    logger.error("❌ Erro ao executar lote de %s comandos: %s", len(commands), e)
+                    return [None] * len(commands)
+        
+        # Sem canal shell (exec_command ou Telnet): execução sequencial
+        return [self.execute_command(command, timeout) for command in commands]
+    
     def _execute_ssh_command(self, command: str, timeout: int) -> str:
         """Executa comando via SSH"""
-        stdin, stdout, stderr = self.connection.exec_command(command, timeout=timeout)
+        self._touch_pool()
+        
+        if self._shell is not None and self._shell_lock.acquire(blocking=False):
+            try:
+                if self._shell is not None:
+                    return self._execute_shell_command(command, timeout)
+            finally:
+                self._shell_lock.release()
+        
+        # Canal exec: fallback ou shell ocupado por outra thread
+        return self._exec_channel_bytes(command, timeout).decode('utf-8', errors='ignore')
+    
+    def _execute_ssh_command_bytes(self, command: str, timeout: int) -> bytes:
+        """Executa comando via SSH, retornando a saída em bytes"""
+        self._touch_pool()
+        
+        # Sempre pelo canal exec: só ele entrega os bytes brutos, sem prompt nem eco
+        return self._exec_channel_bytes(command, timeout)
+    
+    def _exec_channel_bytes(self, command: str, timeout: int) -> bytes:
+        """Executa comando em um canal exec e lê a saída bruta"""
+        stdin, stdout, stderr = self.connection.exec_command(command, bufsize=-1, timeout=timeout)
+        
+        # Ler direto do canal em blocos
+        channel = stdout.channel
+        channel.settimeout(timeout)
+        
+        buf = bytearray()
+        while True:
+            data = channel.recv(65536)
+            if not data:
+                break
+            buf.extend(data)
+        
+        error = stderr.read()
+        
+        if error and b"syntax error" in error.lower():
+            logger.warning("⚠️  Aviso no comando '%s': %s", command, error.decode('utf-8', errors='ignore'))
+        
+        return bytes(buf)
+    
+    def _open_shell(self, timeout: int):
+        """
+        Abre canal shell persistente e aguarda o prompt RouterOS
+        
+        Em caso de falha os comandos seguem pelo caminho exec_command.
+        """
+        try:
+            shell = self.connection.invoke_shell(width=512, height=200)
+            self._shell_pending = bytearray()
+            self._shell = shell
+            
+            banner = bytearray()
+            deadline = time.monotonic() + timeout
+            
+            while not _PROMPT_RE.search(_ANSI_RE.sub('', banner.decode('utf-8', errors='ignore'))):
+                banner.extend(self._recv_shell(deadline))
+            
+            logger.info("🖥️  Canal shell persistente aberto em %s", self.host)
+            
+        except Exception as e:
+            logger.warning("⚠️  Canal shell indisponível em %s (%s), usando exec_command", self.host, e)
+            self._close_shell()
+    
+    def _close_shell(self):
+        """Fecha o canal shell persistente, se existir"""
+        if self._shell is not None:
+            try:
+                self._shell.close()
+            except Exception:
+                pass
+            self._shell = None
+            self._shell_pending = bytearray()
+    
+    def _recv_shell(self, deadline: float) -> bytes:
+        """Lê um bloco do canal shell respeitando o prazo final"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise socket.timeout("Timeout aguardando resposta do canal shell")
+        
+        self._shell.settimeout(remaining)
+        data = self._shell.recv(65536)
+        if not data:
+            raise paramiko.SSHException("Canal shell fechado pelo dispositivo")
+        return data
+    
+    def _execute_shell_command(self, command: str, timeout: int) -> str:
+        """Executa comando no canal shell, lendo até o marcador de fim"""
+        return self._execute_shell_batch([command], timeout)[0]
+    
+    def _execute_shell_batch(self, commands: List[str], timeout: int) -> List[str]:
+        """
+        Envia todos os comandos em uma única escrita no canal shell
+        
+        Cada comando é seguido de um marcador próprio, usado para separar
+        as saídas na leitura.
+        """
+        if self._shell.closed:
+            raise paramiko.SSHException("Canal shell fechado")
+        
+        tokens = [next(self._shell_tokens) for _ in commands]
+        commands = [self._without_paging(command) for command in commands]
+        
+        # Marcador montado por concatenação para que o eco do comando não o contenha
+        payload = ''.join(
+            f'{command}\n:put ("__END_" . "{token}__")\n'
+            for command, token in zip(commands, tokens)
+        )
+        
+        outputs = []
+        try:
+            self._shell.send(payload)
+            for command, token in zip(commands, tokens):
+                raw = self._read_shell_until(f"__END_{token}__".encode(), time.monotonic() + timeout)
+                outputs.append(self._clean_shell_output(raw, command))
+        except Exception:
+            # Canal dessincronizado: descartar e seguir via exec_command
+            self._close_shell()
+            raise
+        
+        return outputs
+    
+    def _without_paging(self, command: str) -> str:
+        """
+        Acrescenta without-paging a comandos print enviados ao console interativo
         
-        output = stdout.read().decode('utf-8', errors='ignore')
-        error = stderr.read().decode('utf-8', errors='ignore')
+        No shell e no Telnet o RouterOS pagina saídas maiores que o terminal
+        (-- [Q quit|D dump|down]) e o marcador de fim nunca chegaria.
+        """
+        if 'without-paging' in command:
+            return command
+        return _PRINT_CMD_RE.sub(r'\1 without-paging', command, count=1)
+    
+    def _read_shell_until(self, marker: bytes, deadline: float) -> bytes:
+        """Acumula dados do canal shell até encontrar o marcador"""
+        buf = self._shell_pending
+        start = 0
         
-        if error and "syntax error" in error.lower():
-            logger.warning(f"⚠️  Aviso no comando '{command}': {error}")
+        while True:
+            idx = buf.find(marker, start)
+            if idx >= 0:
+                self._shell_pending = buf[idx + len(marker):]
+                return bytes(buf[:idx])
+            
+            start = max(0, len(buf) - len(marker))
+            buf.extend(self._recv_shell(deadline))
+    
+    def _clean_shell_output(self, raw: bytes, command: str) -> str:
+        """Remove escapes ANSI, prompts e eco de comandos da saída do shell"""
+        text = _ANSI_RE.sub('', raw.decode('utf-8', errors='ignore')).replace('\r', '')
+        echo = command.strip()
+        
+        lines = [
+            line for line in text.split('\n')
+            if not _PROMPT_LINE_RE.match(line)
+            and line.strip() != echo
+            and not line.lstrip().startswith(':put ("__END_')
+        ]
         
-        return output
+        return '\n'.join(lines).strip('\n')
     
     def _execute_telnet_command(self, command: str, timeout: int) -> str:
         """Executa comando via Telnet"""
-        # Limpar buffer
-        try:
-            self.connection.read_very_eager()
-        except:
-            pass
+        # Limpar buffer (socket do asyncio já é não bloqueante)
+        self.connection.drain()
+        if self.connection.closed:
+            raise EOFError("Conexão Telnet fechada pelo dispositivo")
+        
+        # Enviar comando seguido do marcador de fim (mesmo esquema do canal shell SSH)
+        command = self._without_paging(command)
+        token = next(self._shell_tokens)
+        marker = f"__END_{token}__".encode()
+        self.connection.write(f'{command}\n:put ("__END_" . "{token}__")\n'.encode('ascii'))
         
-        # Enviar comando
-        self.connection.write(command.encode('ascii') + b"\n")
-        time.sleep(0.5)  # Aguardar processamento
+        # Ler resposta até o marcador, sem espera fixa
+        raw = self.connection.read_until(marker, timeout)
+        if raw.endswith(marker):
+            raw = raw[:-len(marker)]
         
-        # Ler resposta até prompt
-        response = self.connection.read_until(b">", timeout).decode('utf-8', errors='ignore')
+        return self._clean_shell_output(raw, command)
+    
+    def api_call(self, path: str, *queries: str, **params) -> Optional[List[Dict[str, object]]]:
+        """
+        Executa um comando pela API RouterOS no dispositivo conectado
         
-        # Limpar o comando enviado da resposta
-        lines = response.split('\n')
-        if len(lines) > 1:
-            response = '\n'.join(lines[1:])
+        Desabilitado por padrão: só é usado com MIKROTIK_USE_API=true. A sessão
+        api-ssl é aberta na primeira chamada; se a API não estiver habilitada
+        ou acessível, retorna None e o chamador deve usar o CLI.
         
-        return response
+        Args:
+            path: Caminho do comando (ex: /ipv6/route/print)
+            queries: Palavras de consulta (ex: ?dst-address=::/0)
+            params: Atributos do comando
+            
+        Returns:
+            List[Dict]: Registros retornados ou None se a API não estiver disponível
+            
+        Raises:
+            MikrotikAPIError: Se o RouterOS recusar o comando (trap)
+        """
+        if not self.host or not api_enabled():
+            return None
+        
+        with self._api_lock:
+            if self._api is None:
+                if self._api_tried:
+                    return None
+                
+                self._api_tried = True
+                api = MikrotikAPI(self.username, self.password)
+                if not api.connect(self.host, API_PORT, self.timeout or 30):
+                    return None
+                self._api = api
+            
+            try:
+                return self._api.call(path, *queries, **params)
+            except MikrotikAPIError:
+                raise
+            except Exception as e:
+                logger.warning("⚠️  Falha na API RouterOS com %s, usando CLI: %s", self.host, e)
+                self._api.close()
+                self._api = None
+                return None
+    
+    def _close_api(self):
+        """Fecha a sessão da API, se aberta"""
+        with self._api_lock:
+            if self._api:
+                self._api.close()
+            self._api = None
+            self._api_tried = False
     
     def disconnect(self):
-        """Fecha a conexão ativa"""
+        """Fecha a conexão ativa (sessões SSH retornam ao pool)"""
+        self._close_api()
         if self.connection:
             try:
-                self.connection.close()
-                logger.info(f"🔌 Desconectado de {self.host}")
+                if self.connection_type == 'ssh':
+                    self._close_shell()
+                    self._touch_pool()
+                    logger.info("🔌 Sessão SSH com %s devolvida ao pool", self.host)
+                else:
+                    self.connection.close()
+                    logger.info("🔌 Desconectado de %s", self.host)
             except:
                 pass
             finally:
                 self.connection = None
                 self.connection_type = None
                 self.host = None
+                self.port = None
+                self.timeout = None
+    
+    def _reconnect_ssh(self) -> bool:
+        """
+        Recupera a sessão SSH após um erro
+        
+        O transporte do pool é compartilhado com outras conexões e threads: se
+        ele ainda está ativo, o erro foi só do canal (ex: shell fechado) e
+        apenas o canal é reaberto. Só um transporte morto sai do pool.
+        """
+        host, port, timeout = self.host, self.port, self.timeout
+        key = (host, port, self.username)
+        
+        with self._reconnect_lock(key):
+            ssh = self.connection
+            transport = ssh.get_transport() if ssh else None
+            
+            if transport is not None and transport.is_active():
+                with self._shell_lock:
+                    if self.use_shell and self._shell is None:
+                        self._open_shell(timeout)
+                return True
+            
+            with self._pool_lock:
+                if self._pool.get(key) is ssh:
+                    del self._pool[key]
+                    self._pool_last_used.pop(key, None)
+            
+            with self._shell_lock:
+                self._close_shell()
+            
+            try:
+                ssh.close()
+            except Exception:
+                pass
+            
+            self.connection = None
+            return self.connect_ssh(host, port, timeout)
+    
+    @classmethod
+    def _reconnect_lock(cls, key: Tuple[str, int, str]) -> threading.Lock:
+        """Retorna o lock de reconexão da chave do pool"""
+        with cls._pool_lock:
+            return cls._reconnect_locks.setdefault(key, threading.Lock())
+    
+    def _touch_pool(self):
+        """Atualiza o instante de último uso da sessão SSH no pool"""
+        key = (self.host, self.port, self.username)
+        with self._pool_lock:
+            if key in self._pool:
+                self._pool_last_used[key] = time.monotonic()
+    
+    @classmethod
+    def _get_pooled_client(cls, key: Tuple[str, int, str]) -> Optional[_TransportClient]:
+        """Retorna sessão SSH ativa do pool, se existir"""
+        cls._reap_idle_pool()
+        
+        with cls._pool_lock:
+            ssh = cls._pool.get(key)
+            if ssh is None:
+                return None
+            
+            transport = ssh.get_transport()
+            if transport and transport.is_active():
+                cls._pool_last_used[key] = time.monotonic()
+                return ssh
+            
+            # Sessão morta: remover do pool
+            del cls._pool[key]
+            cls._pool_last_used.pop(key, None)
+        
+        try:
+            ssh.close()
+        except Exception:
+            pass
+        return None
+    
+    @classmethod
+    def _add_pooled_client(cls, key: Tuple[str, int, str], ssh: _TransportClient) -> _TransportClient:
+        """Registra sessão SSH no pool (mantém a existente se outra thread chegou antes)"""
+        with cls._pool_lock:
+            existing = cls._pool.get(key)
+            if existing is not None and existing.get_transport() and existing.get_transport().is_active():
+                duplicate, ssh = ssh, existing
+            else:
+                duplicate = None
+                cls._pool[key] = ssh
+            cls._pool_last_used[key] = time.monotonic()
+        
+        if duplicate is not None:
+            duplicate.close()
+        return ssh
+    
+    @classmethod
+    def _reap_idle_pool(cls):
+        """Fecha sessões SSH ociosas há mais de POOL_IDLE_TIMEOUT segundos"""
+        now = time.monotonic()
+        expired = []
+        
+        with cls._pool_lock:
+            for key, last_used in list(cls._pool_last_used.items()):
+                if now - last_used > POOL_IDLE_TIMEOUT:
+                    expired.append(cls._pool.pop(key))
+                    del cls._pool_last_used[key]
+        
+        for ssh in expired:
+            try:
+                ssh.close()
+            except Exception:
+                pass
+    
+    @classmethod
+    def shutdown_pool(cls):
+        """Fecha todas as sessões SSH do pool"""
+        with cls._pool_lock:
+            clients = list(cls._pool.items())
+            cls._pool.clear()
+            cls._pool_last_used.clear()
+        
+        for (host, _port, _user), ssh in clients:
+            try:
+                ssh.close()
+                logger.info("🔌 Desconectado de %s", host)
+            except Exception:
+                pass
+    
+    @property
+    def supports_concurrent_exec(self) -> bool:
+        """
+        Indica se execute_command pode ser chamado de várias threads
+        
+        No SSH cada comando concorrente abre seu próprio canal exec sobre o
+        mesmo transporte; o Telnet tem um único fluxo e não suporta.
+        """
+        return self.connection_type == 'ssh'
+    
+    @property
+    def supports_concurrent_batches(self) -> bool:
+        """
+        Indica se execute_commands ganha com chamadas de várias threads
+        
+        Com o canal shell os lotes são serializados no mesmo canal, então
+        threads extras só ficariam esperando; apenas o canal exec paraleliza.
+        """
+        return self.connection_type == 'ssh' and self._shell is None
     
     def is_connected(self) -> bool:
         """Verifica se há uma conexão ativa"""
@@ -7,18 +7,68 @@ Responsável por executar testes de ping, MTU e conectividade IPv6
 import logging
 import re
 import time
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
 from .mikrotik_connection import MikrotikConnection
 
 logger = logging.getLogger(__name__)
 
+# Padrões da saída do ping, ex: 64 bytes from 2001:4860:4860::8888: icmp_seq=1 ttl=119 time=15ms
+_TIME_RE = re.compile(rb'bytes from[^\n]*?time=(\d+(?:\.\d+)?)ms')
+# Ex: 4 packets transmitted, 4 received, 0% packet loss
+_STATS_RE = re.compile(rb'(\d+) packets transmitted, (\d+) received, (\d+)% packet loss')
+# Ex: round-trip min/avg/max = 15/15/16 ms
+_RTT_RE = re.compile(rb'round-trip[^\n]*?min/avg/max = (\d+(?:\.\d+)?)/(\d+(?:\.\d+)?)/(\d+(?:\.\d+)?) ms')
+
+# Faixa e granularidade (bytes) da busca de MTU IPv6
+MTU_MIN = 1280
+MTU_MAX = 1500
+MTU_STEP = 8
+
+@dataclass(slots=True)
+class PingResult:
+    """Resultado de um teste de ping IPv6"""
+    target: str
+    success: bool = False
+    packets_sent: int = 0
+    packets_received: int = 0
+    packet_loss_percent: float = 100
+    avg_time_ms: float = 0.0
+    min_time_ms: float = 0.0
+    max_time_ms: float = 0.0
+    times: List[float] = field(default_factory=list)
+    raw_bytes: bytes = b''
+    error: Optional[str] = None
+    
+    @property
+    def raw_output(self) -> str:
+        """Saída bruta do ping, decodificada apenas quando consultada"""
+        return self.raw_bytes.decode('utf-8', errors='ignore')
+
+@dataclass(slots=True)
+class MtuResult:
+    """Resultado do teste de MTU IPv6"""
+    max_mtu: int = 0
+    recommended_mtu: int = 0
+    tested_sizes: List[int] = field(default_factory=list)
+
+@dataclass(slots=True)
+class ConnectivitySummary:
+    """Resumo dos testes de conectividade"""
+    overall_status: str
+    gateway_reachable: bool
+    external_reachable: bool
+    mtu_adequate: bool
+    max_mtu: int
+
 class MikrotikConnectivityTests:
     """Classe para executar testes de conectividade em dispositivos Mikrotik"""
     
     def __init__(self, connection: MikrotikConnection):
         self.connection = connection
     
-    def test_ipv6_connectivity(self, gateway: str, test_targets: List[str] = None) -> Dict[str, Dict]:
+    def test_ipv6_connectivity(self, gateway: str, test_targets: List[str] = None) -> Dict[str, Union[PingResult, MtuResult, ConnectivitySummary, Dict[str, PingResult]]]:
         """
         Executa testes completos de conectividade IPv6
         
@@ -37,22 +87,29 @@ class MikrotikConnectivityTests:
             test_targets = ["2001:4860:4860::8888"]  # Google DNS IPv6
         
         results = {
-            'gateway_test': {},
+            'gateway_test': None,
             'external_tests': {},
-            'mtu_test': {},
-            'summary': {}
+            'mtu_test': None,
+            'summary': None
         }
         
         logger.info("🧪 Iniciando testes de conectividade IPv6...")
         
         # 1. Teste de ping para gateway
-        logger.info(f"🎯 Testando conectividade com gateway {gateway}")
+        logger.info("🎯 Testando conectividade com gateway %s", gateway)
         results['gateway_test'] = self._ping_ipv6(gateway)
         
-        # 2. Testes de ping para alvos externos
+        # 2. Testes de ping para alvos externos (em paralelo quando suportado)
         for target in test_targets:
-            logger.info(f"🌐 Testando conectividade externa para {target}")
-            results['external_tests'][target] = self._ping_ipv6(target)
+            logger.info("🌐 Testando conectividade externa para %s", target)
+        
+        if self.connection.supports_concurrent_exec and len(test_targets) > 1:
+            with ThreadPoolExecutor(max_workers=len(test_targets)) as executor:
+                pings = executor.map(self._ping_ipv6, test_targets)
+                results['external_tests'] = dict(zip(test_targets, pings))
+        else:
+            for target in test_targets:
+                results['external_tests'][target] = self._ping_ipv6(target)
         
         # 3. Teste de MTU
         logger.info("📏 Testando MTU IPv6")
@@ -66,7 +123,7 @@ class MikrotikConnectivityTests:
         
         return results
     
-    def _ping_ipv6(self, target: str, count: int = 4) -> Dict[str, any]:
+    def _ping_ipv6(self, target: str, count: int = 4) -> PingResult:
         """
         Executa ping IPv6 para um alvo específico
         
@@ -75,135 +132,135 @@ class MikrotikConnectivityTests:
             count: Número de pings
             
         Returns:
-            Dict: Resultados do ping
+            PingResult: Resultados do ping
         """
         try:
             command = f"/ping address={target} count={count} ipv6=yes"
-            output = self.connection.execute_command(command)
+            output = self.connection.execute_command_bytes(command)
             
             if not output:
-                return {
-                    'target': target,
-                    'success': False,
-                    'error': 'Nenhuma resposta do comando ping'
-                }
+                return PingResult(target, error='Nenhuma resposta do comando ping')
             
             return self._parse_ping_output(output, target)
             
         except Exception as e:
-            logger.error(f"❌ Erro no ping para {target}: {e}")
-            return {
-                'target': target,
-                'success': False,
-                'error': str(e)
-            }
+            logger.error("❌ Erro no ping para %s: %s", target, e)
+            return PingResult(target, error=str(e))
     
-    def _parse_ping_output(self, output: str, target: str) -> Dict[str, any]:
+    def _parse_ping_output(self, output: bytes, target: str) -> PingResult:
         """
         Faz parse da saída do comando ping
         
         Args:
-            output: Saída do comando ping
+            output: Saída do comando ping (bytes, sem decodificar)
             target: IP de destino
             
         Returns:
-            Dict: Resultados parseados
+            PingResult: Resultados parseados
         """
-        lines = output.split('\n')
-        
-        # Inicializar resultados
-        result = {
-            'target': target,
-            'success': False,
-            'packets_sent': 0,
-            'packets_received': 0,
-            'packet_loss_percent': 100,
-            'avg_time_ms': 0,
-            'min_time_ms': 0,
-            'max_time_ms': 0,
-            'times': [],
-            'raw_output': output
-        }
+        result = PingResult(target, raw_bytes=output)
         
-        # Parse das linhas individuais de ping
-        ping_times = []
-        for line in lines:
-            # Buscar padrão: 64 bytes from 2001:4860:4860::8888: icmp_seq=1 ttl=119 time=15ms
-            if 'time=' in line and 'bytes from' in line:
-                time_match = re.search(r'time=(\d+(?:\.\d+)?)ms', line)
-                if time_match:
-                    ping_times.append(float(time_match.group(1)))
-        
-        # Parse do resumo final
-        for line in lines:
-            # Buscar padrão: 4 packets transmitted, 4 received, 0% packet loss
-            if 'packets transmitted' in line:
-                stats_match = re.search(r'(\d+) packets transmitted, (\d+) received, (\d+)% packet loss', line)
-                if stats_match:
-                    result['packets_sent'] = int(stats_match.group(1))
-                    result['packets_received'] = int(stats_match.group(2))
-                    result['packet_loss_percent'] = int(stats_match.group(3))
-                    result['success'] = result['packet_loss_percent'] < 100
-            
-            # Buscar padrão: round-trip min/avg/max = 15/15/16 ms
-            if 'round-trip' in line and 'min/avg/max' in line:
-                time_stats = re.search(r'min/avg/max = (\d+(?:\.\d+)?)/(\d+(?:\.\d+)?)/(\d+(?:\.\d+)?) ms', line)
-                if time_stats:
-                    result['min_time_ms'] = float(time_stats.group(1))
-                    result['avg_time_ms'] = float(time_stats.group(2))
-                    result['max_time_ms'] = float(time_stats.group(3))
+        # Tempos individuais de ping (uma única varredura do buffer)
+        ping_times = [float(t) for t in _TIME_RE.findall(output)]
+        
+        # Resumo final: fica no fim da saída, varrer de trás para frente
+        # e parar assim que as duas linhas forem encontradas
+        stats_match = time_stats = None
+        for line in reversed(output.splitlines()):
+            if stats_match is None:
+                stats_match = _STATS_RE.search(line)
+            if time_stats is None:
+                time_stats = _RTT_RE.search(line)
+            if stats_match and time_stats:
+                break
+        
+        if stats_match:
+            result.packets_sent = int(stats_match.group(1))
+            result.packets_received = int(stats_match.group(2))
+            result.packet_loss_percent = int(stats_match.group(3))
+            result.success = result.packet_loss_percent < 100
+        
+        if time_stats:
+            result.min_time_ms = float(time_stats.group(1))
+            result.avg_time_ms = float(time_stats.group(2))
+            result.max_time_ms = float(time_stats.group(3))
         
         # Se não encontrou resumo, usar tempos individuais
-        if ping_times and result['avg_time_ms'] == 0:
-            result['times'] = ping_times
-            result['min_time_ms'] = min(ping_times)
-            result['max_time_ms'] = max(ping_times)
-            result['avg_time_ms'] = sum(ping_times) / len(ping_times)
-            result['packets_received'] = len(ping_times)
-            result['packet_loss_percent'] = max(0, 100 - (len(ping_times) / result.get('packets_sent', 4) * 100))
-            result['success'] = len(ping_times) > 0
+        if ping_times and result.avg_time_ms == 0:
+            result.times = ping_times
+            result.min_time_ms = min(ping_times)
+            result.max_time_ms = max(ping_times)
+            result.avg_time_ms = sum(ping_times) / len(ping_times)
+            result.packets_received = len(ping_times)
+            result.packet_loss_percent = max(0, 100 - (len(ping_times) / (result.packets_sent or 4) * 100))
+            result.success = True
         
         return result
     
-    def _test_mtu_ipv6(self, target: str) -> Dict[str, any]:
+    def _test_mtu_ipv6(self, target: str) -> MtuResult:
         """
-        Testa MTU IPv6 usando ping com tamanhos crescentes
+        Testa MTU IPv6 por busca binária entre MTU_MIN e MTU_MAX
+        
+        O MTU é monotônico (funciona abaixo do limite, falha acima), então a
+        bisecção encontra o maior tamanho funcional com O(log n) pings.
         
         Args:
             target: IP IPv6 de destino
             
         Returns:
-            Dict: Resultados do teste de MTU
+            MtuResult: Resultados do teste de MTU
         """
-        mtu_sizes = [1280, 1300, 1400, 1500, 1600, 1700, 1800, 1900, 2000]
+        candidates = list(range(MTU_MIN, MTU_MAX, MTU_STEP)) + [MTU_MAX]
         max_working_mtu = 0
+        tested_sizes = []
         
         logger.info("📏 Testando MTU IPv6...")
         
-        for size in mtu_sizes:
-            try:
-                # Ping com tamanho específico (sem fragmentação)
-                command = f"/ping address={target} count=1 size={size} do-not-fragment=yes ipv6=yes"
-                output = self.connection.execute_command(command)
-                
-                if output and ('time=' in output or 'received' in output):
-                    max_working_mtu = size
-                    logger.info(f"✅ MTU {size} bytes: OK")
-                else:
-                    logger.info(f"❌ MTU {size} bytes: FALHOU")
-                    break
-                    
-            except Exception as e:
-                logger.error(f"❌ Erro testando MTU {size}: {e}")
-                break
+        lo, hi = 0, len(candidates) - 1
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            size = candidates[mid]
+            tested_sizes.append(size)
+            
+            if self._probe_mtu(target, size):
+                max_working_mtu = size
+                lo = mid + 1
+            else:
+                hi = mid - 1
         
-        return {
-            'max_mtu': max_working_mtu,
-            'recommended_mtu': max_working_mtu - 20 if max_working_mtu > 20 else max_working_mtu,
-            'tested_sizes': mtu_sizes[:mtu_sizes.index(max_working_mtu) + 1] if max_working_mtu > 0 else []
-        }
+        return MtuResult(
+            max_mtu=max_working_mtu,
+            recommended_mtu=max_working_mtu - 20 if max_working_mtu > 20 else max_working_mtu,
+            tested_sizes=sorted(tested_sizes)
+        )
+    
+    def _probe_mtu(self, target: str, size: int) -> bool:
+        """
+        Envia um único ping sem fragmentação com o tamanho informado
+        
+        Args:
+            target: IP IPv6 de destino
+            size: Tamanho do pacote em bytes
+            
+        Returns:
+            bool: True se o ping com esse tamanho teve resposta
+        """
+        try:
+            command = f"/ping address={target} count=1 size={size} do-not-fragment=yes ipv6=yes"
+            output = self.connection.execute_command_bytes(command)
+            
+            if output and (b'time=' in output or b'received' in output):
+                logger.info("✅ MTU %s bytes: OK", size)
+                return True
+            
+            logger.info("❌ MTU %s bytes: FALHOU", size)
+            return False
+            
+        except Exception as e:
+            logger.error("❌ Erro testando MTU %s: %s", size, e)
+            return False
     
-    def _generate_connectivity_summary(self, results: Dict) -> Dict[str, any]:
+    def _generate_connectivity_summary(self, results: Dict) -> ConnectivitySummary:
         """
         Gera resumo dos testes de conectividade
         
@@ -211,24 +268,27 @@ class MikrotikConnectivityTests:
             results: Resultados dos testes
             
         Returns:
-            Dict: Resumo dos testes
+            ConnectivitySummary: Resumo dos testes
         """
-        gateway_ok = results.get('gateway_test', {}).get('success', False)
+        gateway_test = results.get('gateway_test')
+        gateway_ok = gateway_test is not None and gateway_test.success
         
         external_tests = results.get('external_tests', {})
-        external_ok = any(test.get('success', False) for test in external_tests.values())
+        external_ok = any(test.success for test in external_tests.values())
         
-        mtu_ok = results.get('mtu_test', {}).get('max_mtu', 0) >= 1280
+        mtu_test = results.get('mtu_test')
+        max_mtu = mtu_test.max_mtu if mtu_test else 0
+        mtu_ok = max_mtu >= 1280
         
         overall_status = "✅ SUCESSO" if (gateway_ok and external_ok and mtu_ok) else "❌ PROBLEMAS"
         
-        return {
-            'overall_status': overall_status,
-            'gateway_reachable': gateway_ok,
-            'external_reachable': external_ok,
-            'mtu_adequate': mtu_ok,
-            'max_mtu': results.get('mtu_test', {}).get('max_mtu', 0)
-        }
+        return ConnectivitySummary(
+            overall_status=overall_status,
+            gateway_reachable=gateway_ok,
+            external_reachable=external_ok,
+            mtu_adequate=mtu_ok,
+            max_mtu=max_mtu
+        )
     
     def _log_test_results(self, results: Dict):
         """
@@ -237,31 +297,31 @@ class MikrotikConnectivityTests:
         Args:
             results: Resultados dos testes
         """
+        # Nada a montar se INFO estiver desabilitado
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
         logger.info("📊 RESULTADOS DOS TESTES DE CONECTIVIDADE")
         logger.info("=" * 50)
         
         # Gateway
-        gateway_test = results.get('gateway_test', {})
+        gateway_test = results.get('gateway_test')
         if gateway_test:
-            status = "✅ OK" if gateway_test.get('success') else "❌ FALHA"
-            loss = gateway_test.get('packet_loss_percent', 100)
-            avg_time = gateway_test.get('avg_time_ms', 0)
-            logger.info(f"🎯 Gateway: {status} | Perda: {loss}% | Latência: {avg_time:.1f}ms")
+            status = "✅ OK" if gateway_test.success else "❌ FALHA"
+            logger.info("🎯 Gateway: %s | Perda: %s%% | Latência: %.1fms", status, gateway_test.packet_loss_percent, gateway_test.avg_time_ms)
         
         # Testes externos
         external_tests = results.get('external_tests', {})
         for target, test in external_tests.items():
-            status = "✅ OK" if test.get('success') else "❌ FALHA"
-            loss = test.get('packet_loss_percent', 100)
-            avg_time = test.get('avg_time_ms', 0)
-            logger.info(f"🌐 {target}: {status} | Perda: {loss}% | Latência: {avg_time:.1f}ms")
+            status = "✅ OK" if test.success else "❌ FALHA"
+            logger.info("🌐 %s: %s | Perda: %s%% | Latência: %.1fms", target, status, test.packet_loss_percent, test.avg_time_ms)
         
         # MTU
-        mtu_test = results.get('mtu_test', {})
-        max_mtu = mtu_test.get('max_mtu', 0)
-        logger.info(f"📏 MTU Máximo: {max_mtu} bytes")
+        mtu_test = results.get('mtu_test')
+        max_mtu = mtu_test.max_mtu if mtu_test else 0
+        logger.info("📏 MTU Máximo: %s bytes", max_mtu)
         
         # Resumo
-        summary = results.get('summary', {})
-        logger.info(f"📊 Status Geral: {summary.get('overall_status', 'DESCONHECIDO')}")
-        logger.info("=" * 50) 
\ No newline at end of file
+        summary = results.get('summary')
+        logger.info("📊 Status Geral: %s", summary.overall_status if summary else 'DESCONHECIDO')
+        logger.info("=" * 50)
\ No newline at end of file
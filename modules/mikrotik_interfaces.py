@@ -6,23 +6,131 @@ Responsável por listar e gerenciar interfaces L2TP
 
 import logging
 import re
-from typing import List, Dict, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, NamedTuple, Optional, Tuple, Union
 from .mikrotik_connection import MikrotikConnection
 
 logger = logging.getLogger(__name__)
 
+# Padrões compilados uma única vez no carregamento do módulo
+# Ex:  0  R <l2tp-caetite>  caetite  1450  10.0.0.2 (aplicado à linha já sem espaços nas bordas)
+_L2TP_SERVER_RE = re.compile(r'(\d+)\s+([DRX]+(?:\s+[DRX]+)*)\s*<\s*([^>]*?)\s*>\s+(\S+)\s+(\d+)\s+([\d\.]+)')
+# Nome da interface cliente, com ou sem <> / aspas (ex: <l2tp-out1>, name="l2tp-out1")
+_L2TP_CLIENT_NAME_RE = re.compile(r'<?(l2tp-[^\s<>"]+)>?', re.IGNORECASE)
+# Linhas não vazias, percorridas sob demanda (sem montar lista com split)
+_LINE_RE = re.compile(r'[^\n]+')
+_SERVER_FLAG_CHARS = frozenset('DRX ')
+
+# Validade (segundos) do índice nome -> interface usado nas consultas
+_INDEX_TTL = 5.0
+
+class L2TPServerIface(NamedTuple):
+    """Interface L2TP Server ativa (linha do l2tp-server print)"""
+    id: str
+    flags: str
+    name: str
+    user: str
+    mtu: str
+    client_address: str
+    status: str = 'running'
+
+class L2TPClientIface(NamedTuple):
+    """Interface L2TP Client"""
+    name: str
+    type: str = 'client'
+
+def _split_l2tp_server_row(line: str) -> Optional[Tuple[str, str, str, str, str, str]]:
+    """
+    Separa uma linha do l2tp-server print sem regex
+    
+    Returns:
+        Tuple: (id, flags, nome, usuário, mtu, client-address) ou None se a
+        linha não tiver o formato esperado
+    """
+    head = line.split(None, 1)
+    if len(head) != 2 or not head[0].isdigit():
+        return None
+    
+    row_id, rest = head
+    lt = rest.find('<')
+    if lt < 0:
+        return None
+    
+    flags = rest[:lt].strip()
+    if not _SERVER_FLAG_CHARS.issuperset(flags):
+        return None
+    
+    gt = rest.find('>', lt + 1)
+    if gt < 0:
+        return None
+    
+    tail = rest[gt + 1:].split(None, 3)
+    if len(tail) < 3 or not tail[1].isdigit():
+        return None
+    
+    return row_id, flags, rest[lt + 1:gt].strip(), tail[0], tail[1], tail[2]
+
+def _server_columns(header: str) -> Optional[Tuple[int, int, int, Optional[int]]]:
+    """
+    Calcula as posições das colunas a partir da linha de header do l2tp-server print
+    
+    Returns:
+        Tuple: (início NAME, início USER, início CLIENT-ADDRESS, fim CLIENT-ADDRESS
+        ou None se for a última coluna) ou None se o header for inesperado
+    """
+    name_at = header.find('NAME')
+    user_at = header.find('USER', name_at)
+    addr_at = header.find('CLIENT-ADDRESS', user_at)
+    if name_at < 0 or user_at < 0 or addr_at < 0:
+        return None
+    
+    # Próxima coluna (ex: UPTIME), se houver, delimita o client-address
+    after = addr_at + len('CLIENT-ADDRESS')
+    rest = header[after:].split(None, 1)
+    addr_end = header.find(rest[0], after) if rest else None
+    
+    return name_at, user_at, addr_at, addr_end
+
+def _slice_l2tp_server_row(line: str, columns: Tuple[int, int, int, Optional[int]]) -> Optional[Tuple[str, str, str, str, str, str]]:
+    """
+    Separa uma linha do l2tp-server print por posição de coluna
+    
+    USER e MTU são lidos juntos porque o MTU é alinhado à direita e pode
+    começar antes do header.
+    
+    Returns:
+        Tuple: (id, flags, nome, usuário, mtu, client-address) ou None se a
+        linha não estiver alinhada com o header
+    """
+    name_at, user_at, addr_at, addr_end = columns
+    
+    head = line[:name_at].split(None, 1)
+    name = line[name_at:user_at].rstrip()
+    user_mtu = line[user_at:addr_at].split()
+    client_address = line[addr_at:addr_end].strip()
+    
+    if (len(head) != 2 or not head[0].isdigit() or len(user_mtu) != 2
+            or not user_mtu[1].isdigit() or not client_address
+            or name[:1] != '<' or name[-1:] != '>'):
+        return None
+    
+    return head[0], head[1].strip(), name[1:-1].strip(), user_mtu[0], user_mtu[1], client_address
+
 class MikrotikInterfaces:
     """Classe para gerenciar interfaces L2TP em dispositivos Mikrotik"""
     
     def __init__(self, connection: MikrotikConnection):
         self.connection = connection
+        self._index: Optional[Dict[str, Union[L2TPServerIface, L2TPClientIface]]] = None
+        self._index_time = 0.0
     
-    def list_l2tp_server_interfaces(self) -> List[Dict[str, str]]:
+    def list_l2tp_server_interfaces(self) -> List[L2TPServerIface]:
         """
         Lista todas as interfaces L2TP Server ativas
         
         Returns:
-            List[Dict]: Lista de interfaces com suas informações
+            List[L2TPServerIface]: Lista de interfaces com suas informações
         """
         if not self.connection.is_connected():
             logger.error("❌ Conexão não estabelecida")
@@ -43,7 +151,7 @@ class MikrotikInterfaces:
             
             # Log das interfaces encontradas
             for interface in interfaces:
-                logger.info(f"  🔗 {interface['name']} - Cliente: {interface['client_address']} - Usuário: {interface['user']}")
+                logger.info(f"  🔗 {interface.name} - Cliente: {interface.client_address} - Usuário: {interface.user}")
             
             return interfaces
             
@@ -51,12 +159,12 @@ class MikrotikInterfaces:
             logger.error(f"❌ Erro ao listar interfaces L2TP Server: {e}")
             return []
     
-    def list_l2tp_client_interfaces(self) -> List[Dict[str, str]]:
+    def list_l2tp_client_interfaces(self) -> List[L2TPClientIface]:
         """
         Lista todas as interfaces L2TP Client
         
         Returns:
-            List[Dict]: Lista de interfaces cliente L2TP
+            List[L2TPClientIface]: Lista de interfaces cliente L2TP
         """
         if not self.connection.is_connected():
             logger.error("❌ Conexão não estabelecida")
@@ -80,7 +188,7 @@ class MikrotikInterfaces:
             logger.error(f"❌ Erro ao listar interfaces L2TP Client: {e}")
             return []
     
-    def _parse_l2tp_server_output(self, output: str) -> List[Dict[str, str]]:
+    def _parse_l2tp_server_output(self, output: str) -> List[L2TPServerIface]:
         """
         Faz parse da saída do comando l2tp-server print
         
@@ -88,51 +196,55 @@ class MikrotikInterfaces:
             output: Saída do comando RouterOS
             
         Returns:
-            List[Dict]: Lista de interfaces parseadas
+            List[L2TPServerIface]: Lista de interfaces parseadas
         """
         interfaces = []
-        lines = output.split('\n')
         
-        # Encontrar linha com headers
-        header_line = -1
-        for i, line in enumerate(lines):
-            if 'NAME' in line and 'USER' in line and 'CLIENT-ADDRESS' in line:
-                header_line = i
-                break
-        
-        if header_line == -1:
+        # Localizar header direto no buffer (sem varrer linha a linha)
+        header_offset = output.find('CLIENT-ADDRESS')
+        if header_offset < 0:
             logger.warning("⚠️  Headers não encontrados na saída l2tp-server")
             return []
         
+        # Dados começam na linha seguinte ao header
+        data_start = output.find('\n', header_offset) + 1
+        if data_start == 0:
+            return []
+        
+        # Layout das colunas desta saída, obtido do próprio header
+        header_start = output.rfind('\n', 0, header_offset) + 1
+        columns = _server_columns(output[header_start:data_start - 1])
+        
         # Processar linhas de dados
-        for line in lines[header_line + 1:]:
-            line = line.strip()
+        for line_match in _LINE_RE.finditer(output, data_start):
+            raw_line = line_match.group()
+            line = raw_line.strip()
             
             # Pular linhas vazias
             if not line:
                 continue
             
-            # Buscar padrão: número, flags, nome da interface
-            match = re.match(r'\s*(\d+)\s+([DRX\s]+)\s*<([^>]+)>\s+(\S+)\s+(\d+)\s+([\d\.]+)', line)
+            # Apenas interfaces ativas: sem 'R' antes do nome, nem dividir a linha
+            if 'R' not in line[:line.find('<')]:
+                continue
             
-            if match:
-                interface_info = {
-                    'id': match.group(1).strip(),
-                    'flags': match.group(2).strip(),
-                    'name': match.group(3).strip(),
-                    'user': match.group(4).strip(),
-                    'mtu': match.group(5).strip(),
-                    'client_address': match.group(6).strip(),
-                    'status': 'running' if 'R' in match.group(2) else 'disabled'
-                }
-                
-                # Apenas interfaces ativas
-                if 'R' in interface_info['flags']:
-                    interfaces.append(interface_info)
+            # Fatiamento por coluna; divisão da linha e regex para formatos inesperados
+            fields = _slice_l2tp_server_row(raw_line, columns) if columns else None
+            
+            if fields is None:
+                fields = _split_l2tp_server_row(line)
+            
+            if fields is None:
+                match = _L2TP_SERVER_RE.match(line)
+                if not match:
+                    continue
+                fields = match.groups()
+            
+            interfaces.append(L2TPServerIface(*fields))
         
         return interfaces
     
-    def _parse_l2tp_client_output(self, output: str) -> List[Dict[str, str]]:
+    def _parse_l2tp_client_output(self, output: str) -> List[L2TPClientIface]:
         """
         Faz parse da saída do comando l2tp-client print
         
@@ -140,33 +252,19 @@ class MikrotikInterfaces:
             output: Saída do comando RouterOS
             
         Returns:
-            List[Dict]: Lista de interfaces client parseadas
+            List[L2TPClientIface]: Lista de interfaces client parseadas
         """
         interfaces = []
-        lines = output.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Buscar linhas com interfaces L2TP
-            if 'l2tp-' in line.lower():
-                # Extrair nome da interface
-                parts = line.split()
-                for part in parts:
-                    if part.startswith('l2tp-') or 'l2tp-' in part:
-                        interface_name = part.strip('<>')
-                        
-                        interface_info = {
-                            'name': interface_name,
-                            'type': 'client'
-                        }
-                        
-                        interfaces.append(interface_info)
-                        break
+        
+        for line_match in _LINE_RE.finditer(output):
+            # Buscar e extrair nome da interface L2TP em uma única busca
+            match = _L2TP_CLIENT_NAME_RE.search(line_match.group())
+            if match:
+                interfaces.append(L2TPClientIface(match.group(1)))
         
         return interfaces
     
-    def get_interface_details(self, interface_name: str) -> Optional[Dict[str, str]]:
+    def get_interface_details(self, interface_name: str) -> Optional[Union[L2TPServerIface, L2TPClientIface]]:
         """
         Obtém detalhes específicos de uma interface
         
@@ -174,32 +272,57 @@ class MikrotikInterfaces:
             interface_name: Nome da interface
             
         Returns:
-            Dict: Detalhes da interface ou None se não encontrada
+            L2TPServerIface | L2TPClientIface: Detalhes da interface ou None se não encontrada
         """
         if not self.connection.is_connected():
             logger.error("❌ Conexão não estabelecida")
             return None
         
         try:
-            # Buscar na lista de interfaces L2TP Server
-            server_interfaces = self.list_l2tp_server_interfaces()
-            for interface in server_interfaces:
-                if interface['name'] == interface_name:
-                    return interface
+            interface = self._get_interface_index().get(interface_name)
             
-            # Buscar na lista de interfaces L2TP Client
-            client_interfaces = self.list_l2tp_client_interfaces()
-            for interface in client_interfaces:
-                if interface['name'] == interface_name:
-                    return interface
+            if interface is None:
+                logger.warning(f"⚠️  Interface {interface_name} não encontrada")
             
-            logger.warning(f"⚠️  Interface {interface_name} não encontrada")
-            return None
+            return interface
             
         except Exception as e:
             logger.error(f"❌ Erro ao obter detalhes da interface {interface_name}: {e}")
             return None
     
+    def _build_interface_index(self) -> Dict[str, Union[L2TPServerIface, L2TPClientIface]]:
+        """
+        Monta índice nome -> interface com as listas L2TP Server e Client
+        
+        Returns:
+            Dict: Interfaces indexadas pelo nome (Server tem prioridade)
+        """
+        if not self.connection.is_connected():
+            logger.error("❌ Conexão não estabelecida")
+            return {}
+            
+        # Listagens independentes: em paralelo quando a conexão permite
+        if self.connection.supports_concurrent_exec:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                server_future = executor.submit(self.list_l2tp_server_interfaces)
+                client_future = executor.submit(self.list_l2tp_client_interfaces)
+                server_interfaces, client_interfaces = server_future.result(), client_future.result()
+        else:
+            server_interfaces = self.list_l2tp_server_interfaces()
+            client_interfaces = self.list_l2tp_client_interfaces()
+            
+        index = {iface.name: iface for iface in client_interfaces}
+        index.update((iface.name, iface) for iface in server_interfaces)
+        return index
+    
+    def _get_interface_index(self) -> Dict[str, Union[L2TPServerIface, L2TPClientIface]]:
+        """Retorna o índice de interfaces, remontando se expirado (_INDEX_TTL)"""
+        now = time.monotonic()
+        if self._index is None or now - self._index_time > _INDEX_TTL:
+            self._index = self._build_interface_index()
+            self._index_time = now
+        return self._index
+    
     def check_interface_exists(self, interface_name: str) -> bool:
         """
         Verifica se uma interface existe
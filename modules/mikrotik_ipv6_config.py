@@ -6,11 +6,29 @@ Responsável por configurar endereços IPv6 em interfaces
 
 import logging
 import re
-from typing import List, Dict, Optional, Tuple
+from typing import List, NamedTuple, Optional, Tuple
 from .mikrotik_connection import MikrotikConnection
 
 logger = logging.getLogger(__name__)
 
+# ID interno RouterOS retornado por [find] (ex: *1A)
+_ITEM_ID_RE = re.compile(r'\*[0-9A-Fa-f]+')
+# Status por entrada impresso pelo script de adição em lote
+_BULK_STATUS_RE = re.compile(r'__(OK|EXISTS|ERR)_(\d+)__')
+# Assinaturas de erro do RouterOS na saída de comandos
+_CMD_ERR_RE = re.compile(r'(?:syntax error|failure|bad command|no such item)', re.IGNORECASE)
+# Campos emitidos pelo script de listagem, separados por tab
+_IPV6_FIELDS = ('id', 'address', 'interface', 'advertise', 'dynamic', 'disabled', 'comment')
+
+class IPv6Addr(NamedTuple):
+    """Endereço IPv6 configurado no dispositivo"""
+    id: str
+    flags: str
+    address: str
+    interface: str
+    advertise: bool
+    comment: Optional[str]
+
 class MikrotikIPv6Config:
     """Classe para configurar endereços IPv6 em dispositivos Mikrotik"""
     
@@ -30,37 +48,73 @@ class MikrotikIPv6Config:
         Returns:
             bool: True se configurado com sucesso, False caso contrário
         """
+        success_count, _ = self.add_ipv6_addresses_bulk([(interface, address, advertise, comment)])
+        return success_count == 1
+    
+    def add_ipv6_addresses_bulk(self, entries: List[Tuple[str, str, bool, Optional[str]]]) -> Tuple[int, int]:
+        """
+        Adiciona vários endereços IPv6 com um único script RouterOS
+        
+        A verificação de endereço existente é feita no próprio script, que
+        imprime um status por entrada; tudo em uma única ida ao dispositivo.
+        
+        Args:
+            entries: Lista de (interface, endereço, advertise, comentário)
+                [('bridge', '2804:385c:8700::15/126', False, 'CAETITE')]
+            
+        Returns:
+            Tuple[int, int]: (sucessos, falhas); endereços já existentes contam como sucesso
+        """
         if not self.connection.is_connected():
             logger.error("❌ Conexão não estabelecida")
-            return False
+            return 0, len(entries)
+        
+        if not entries:
+            return 0, 0
         
         try:
-            # Verificar se o endereço já existe
-            if self._address_exists(interface, address):
-                logger.warning(f"⚠️  Endereço {address} já existe na interface {interface}")
-                return True
-            
-            # Construir comando
-            advertise_flag = "yes" if advertise else "no"
-            command = f"/ipv6 address add address={address} interface={interface} advertise={advertise_flag}"
-            
-            if comment:
-                command += f" comment=\"{comment}\""
-            
-            # Executar comando
-            output = self.connection.execute_command(command)
-            
-            # Verificar se houve erro
-            if output and ("syntax error" in output.lower() or "failure" in output.lower()):
-                logger.error(f"❌ Erro ao adicionar IPv6 {address} na interface {interface}: {output}")
-                return False
+            statements = []
+            for i, (interface, address, advertise, comment) in enumerate(entries):
+                advertise_flag = "yes" if advertise else "no"
+                command = f"/ipv6 address add address={address} interface={interface} advertise={advertise_flag}"
+                
+                if comment:
+                    command += f" comment=\"{comment}\""
+                
+                # Marcadores montados por concatenação para não aparecerem no eco
+                statements.append(
+                    f':if ([:len [/ipv6 address find where {self._address_filter(interface, address)}]] > 0) '
+                    f'do={{ :put ("__EXISTS_" . "{i}__") }} '
+                    f'else={{ :do {{ {command}; :put ("__OK_" . "{i}__") }} on-error={{ :put ("__ERR_" . "{i}__") }} }}'
+                )
+            
+            # Executar script
+            output = self.connection.execute_command("; ".join(statements)) or ''
+            
+            status = {int(index): state for state, index in _BULK_STATUS_RE.findall(output)}
+            
+            # Sem nenhum marcador o script não chegou a rodar (ex: erro de sintaxe)
+            if not status and _CMD_ERR_RE.search(output):
+                logger.error(f"❌ Erro no script de adição de IPv6 em lote: {output}")
+                return 0, len(entries)
+            
+            success_count = 0
+            for i, (interface, address, _, _) in enumerate(entries):
+                state = status.get(i)
+                if state == 'EXISTS':
+                    logger.warning(f"⚠️  Endereço {address} já existe na interface {interface}")
+                    success_count += 1
+                elif state == 'OK':
+                    logger.info(f"✅ IPv6 {address} adicionado na interface {interface}")
+                    success_count += 1
+                else:
+                    logger.error(f"❌ Erro ao adicionar IPv6 {address} na interface {interface}")
             
-            logger.info(f"✅ IPv6 {address} adicionado na interface {interface}")
-            return True
+            return success_count, len(entries) - success_count
             
         except Exception as e:
-            logger.error(f"❌ Erro ao adicionar IPv6 {address} na interface {interface}: {e}")
-            return False
+            logger.error(f"❌ Erro ao adicionar endereços IPv6 em lote: {e}")
+            return 0, len(entries)
     
     def remove_ipv6_address(self, interface: str, address: str) -> bool:
         """
@@ -89,7 +143,7 @@ class MikrotikIPv6Config:
             command = f"/ipv6 address remove {address_id}"
             output = self.connection.execute_command(command)
             
-            if output and ("syntax error" in output.lower() or "failure" in output.lower()):
+            if output and _CMD_ERR_RE.search(output):
                 logger.error(f"❌ Erro ao remover IPv6 {address}: {output}")
                 return False
             
@@ -100,7 +154,7 @@ class MikrotikIPv6Config:
             logger.error(f"❌ Erro ao remover IPv6 {address} da interface {interface}: {e}")
             return False
     
-    def list_ipv6_addresses(self, interface: str = None) -> List[Dict[str, str]]:
+    def list_ipv6_addresses(self, interface: str = None) -> List[IPv6Addr]:
         """
         Lista endereços IPv6 configurados
         
@@ -108,22 +162,28 @@ class MikrotikIPv6Config:
             interface: Interface específica (opcional)
             
         Returns:
-            List[Dict]: Lista de endereços IPv6
+            List[IPv6Addr]: Lista de endereços IPv6
         """
         if not self.connection.is_connected():
             logger.error("❌ Conexão não estabelecida")
             return []
         
         try:
-            # Comando para listar endereços IPv6
-            command = "/ipv6 address print"
+            # Script que imprime um registro por linha, campos separados por tab
+            find = "/ipv6 address find"
             if interface:
-                command += f" where interface={interface}"
+                find += f" where interface={interface}"
+            
+            command = (
+                f':foreach i in=[{find}] do={{ :local a [/ipv6 address get $i]; '
+                ':put ("$i\\t" . ($a->"address") . "\\t" . ($a->"interface") . "\\t" . ($a->"advertise") . "\\t" . '
+                '($a->"dynamic") . "\\t" . ($a->"disabled") . "\\t" . ($a->"comment")) }'
+            )
             
             output = self.connection.execute_command(command)
             
             if not output:
-                logger.warning("⚠️  Nenhuma resposta do comando ipv6 address print")
+                logger.warning("⚠️  Nenhuma resposta da listagem de endereços IPv6")
                 return []
             
             addresses = self._parse_ipv6_addresses(output)
@@ -139,84 +199,51 @@ class MikrotikIPv6Config:
             logger.error(f"❌ Erro ao listar endereços IPv6: {e}")
             return []
     
-    def _address_exists(self, interface: str, address: str) -> bool:
-        """Verifica se um endereço IPv6 já existe na interface"""
-        try:
-            addresses = self.list_ipv6_addresses(interface)
-            
-            # Normalizar endereço para comparação (remover /prefixo se necessário)
-            check_address = address.split('/')[0] if '/' in address else address
-            
-            for addr in addresses:
-                existing_address = addr.get('address', '').split('/')[0]
-                if existing_address == check_address:
-                    return True
-            
-            return False
-            
-        except Exception:
-            return False
+    def _address_filter(self, interface: str, address: str) -> str:
+        """Monta filtro RouterOS por interface e endereço (ignorando o prefixo)"""
+        host = address.partition('/')[0]
+        return f'interface={interface} and address~"^{host}/"'
     
     def _find_address_id(self, interface: str, address: str) -> Optional[str]:
         """Encontra o ID de um endereço IPv6 específico"""
         try:
-            addresses = self.list_ipv6_addresses(interface)
-            
-            check_address = address.split('/')[0] if '/' in address else address
+            # Apenas o ID interno é retornado, sem listar a tabela inteira
+            command = f":put [/ipv6 address find where {self._address_filter(interface, address)}]"
+            output = self.connection.execute_command(command)
             
-            for addr in addresses:
-                existing_address = addr.get('address', '').split('/')[0]
-                if existing_address == check_address:
-                    return addr.get('id')
-            
-            return None
+            match = _ITEM_ID_RE.search(output) if output else None
+            return match.group(0) if match else None
             
         except Exception:
             return None
     
-    def _parse_ipv6_addresses(self, output: str) -> List[Dict[str, str]]:
+    def _parse_ipv6_addresses(self, output: str) -> List[IPv6Addr]:
         """
-        Faz parse da saída do comando ipv6 address print
+        Faz parse da listagem de endereços IPv6 (um registro por linha, campos separados por tab)
         
         Args:
-            output: Saída do comando RouterOS
+            output: Saída do script de listagem
             
         Returns:
-            List[Dict]: Lista de endereços parseados
+            List[IPv6Addr]: Lista de endereços parseados
         """
         addresses = []
-        lines = output.split('\n')
-        
-        current_entry = {}
+        field_count = len(_IPV6_FIELDS)
         
-        for line in lines:
-            line = line.strip()
-            
-            # Pular linhas vazias e headers
-            if not line or 'Flags:' in line or '#' in line and 'ADDRESS' in line:
+        for line in output.splitlines():
+            parts = line.split('\t')
+            if len(parts) != field_count:
                 continue
             
-            # Nova entrada (linha com número)
-            if re.match(r'^\s*\d+', line):
-                # Salvar entrada anterior se existir
-                if current_entry:
-                    addresses.append(current_entry)
-                    current_entry = {}
-                
-                # Parse da nova linha
-                parts = line.split()
-                
-                # Verificar se é uma nova entrada ou continuação de uma existente
-                if len(parts) > 1:
-                    current_entry = {
-                        'id': parts[0],
-                        'flags': parts[1],
-                        'address': parts[2],
-                        'interface': parts[3],
-                        'advertise': parts[4] == 'yes',
-                        'comment': parts[5] if len(parts) > 5 else None
-                    }
-                else:
-                    current_entry = {}
+            row_id, address, interface, advertise, dynamic, disabled, comment = parts
+            
+            addresses.append(IPv6Addr(
+                id=row_id.strip(),
+                flags=('X' if disabled == 'true' else '') + ('D' if dynamic == 'true' else ''),
+                address=address,
+                interface=interface,
+                advertise=advertise == 'true',
+                comment=comment.rstrip('\r') or None
+            ))
         
         return addresses 
\ No newline at end of file
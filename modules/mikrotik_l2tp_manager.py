@@ -4,19 +4,117 @@ Módulo L2TP Manager - Mikrotik Automation
 Especializado em configuração de servidores e clientes L2TP
 """
 
+import io
+import ipaddress
 import logging
 import re
-from typing import List, Dict, Optional, Tuple
+import threading
+import time
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from .mikrotik_connection import MikrotikConnection
 from .mikrotik_connectivity_tests import MikrotikConnectivityTests
 
 logger = logging.getLogger(__name__)
 
+# Prefixo das interfaces L2TP, testado sem criar cópias em minúsculas
+_L2TP_PREFIX_RE = re.compile(r'l2tp-', re.IGNORECASE)
+
+# Status por etapa impresso pelo script de configuração do cliente
+_STAGE_STATUS_RE = re.compile(r'\b(OK|EXISTS|ERR):(ADDR|ROUTE)\b')
+
+# Destinos dos testes de conectividade pós-configuração (Google DNS IPv6)
+_CONNECTIVITY_TEST_TARGETS = ["2001:4860:4860::8888", "2001:4860:4860::8844"]
+
+# Managers já criados por (host, usuário), reaproveitados entre chamadas
+_managers: Dict[Tuple[str, str], 'MikrotikL2TPManager'] = {}
+_managers_lock = threading.Lock()
+
+def get_or_create_manager(host: str, username: str, password: str,
+                          method: str = 'ssh') -> Optional['MikrotikL2TPManager']:
+    """
+    Retorna o manager L2TP (e sua conexão) já aberto para o host, criando se necessário
+    
+    Args:
+        host: Endereço do dispositivo
+        username: Usuário de acesso
+        password: Senha de acesso
+        method: Método de conexão ('ssh' ou 'telnet')
+        
+    Returns:
+        MikrotikL2TPManager: Manager conectado ou None se a conexão falhar
+    """
+    key = (host, username)
+    
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is not None and manager.connection.is_connected():
+            return manager
+        # Entrada inválida (conexão encerrada via disconnect)
+        _managers.pop(key, None)
+    
+    connection = MikrotikConnection(username, password)
+    if method.lower() == 'ssh':
+        success = connection.connect_ssh(host)
+    else:
+        success = connection.connect_telnet(host)
+    
+    if not success:
+        return None
+    
+    manager = MikrotikL2TPManager(connection)
+    
+    with _managers_lock:
+        existing = _managers.get(key)
+        if existing is not None and existing.connection.is_connected():
+            # Outra thread registrou primeiro; descartar a conexão duplicada
+            connection.disconnect()
+            return existing
+        _managers[key] = manager
+    
+    return manager
+
+def close_managers():
+    """Desconecta e descarta todos os managers L2TP registrados"""
+    with _managers_lock:
+        managers = list(_managers.values())
+        _managers.clear()
+    
+    for manager in managers:
+        manager.connection.disconnect()
+
 class MikrotikL2TPManager:
     """Classe especializada para gerenciar configurações L2TP Server e Client"""
     
+    # Validade (segundos) das consultas de descoberta em cache
+    _TUNNELS_TTL = 30.0
+    _BRIDGES_TTL = 60.0
+    _IFACE_TTL = 30.0
+    
     def __init__(self, connection: MikrotikConnection):
         self.connection = connection
+        self._iface_cache: Dict[str, Tuple[float, Any]] = {}
+        self._connectivity_tests: Optional[MikrotikConnectivityTests] = None
+    
+    def _cached(self, key: str, ttl: float, loader: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor em cache se ainda válido, senão executa o loader
+        
+        Args:
+            key: Chave da consulta
+            ttl: Validade em segundos
+            loader: Função que consulta o dispositivo (None indica falha e não é guardado)
+            
+        Returns:
+            Any: Valor da consulta
+        """
+        cached = self._iface_cache.get(key)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        
+        value = loader()
+        if value is not None:
+            self._iface_cache[key] = (time.monotonic(), value)
+        return value
     
     def configure_l2tp_server_tunnel(self, tunnel_name: str, server_ip: str, 
                                    client_ip: str, route_network: str, 
@@ -34,6 +132,11 @@ class MikrotikL2TPManager:
         Returns:
             bool: True se configurado com sucesso
         """
+        # Endereços inválidos são rejeitados antes de qualquer ida ao dispositivo
+        if not self._valid_ipv6(server_ip=server_ip, client_ip=client_ip,
+                                route_network=route_network, route_gateway=route_gateway):
+            return False
+        
         if not self.connection.is_connected():
             logger.error("❌ Conexão não estabelecida")
             return False
@@ -43,42 +146,47 @@ class MikrotikL2TPManager:
             tunnel_interface = self._find_l2tp_tunnel_by_name(tunnel_name)
             
             if not tunnel_interface:
-                logger.error(f"❌ Túnel '{tunnel_name}' não encontrado no servidor")
+                logger.error("❌ Túnel '%s' não encontrado no servidor", tunnel_name)
                 return False
             
-            logger.info(f"🔍 Túnel encontrado: {tunnel_interface}")
+            logger.info("🔍 Túnel encontrado: %s", tunnel_interface)
             
-            # 2. Adicionar IP IPv6 no servidor (interface do túnel)
+            # 2. Adicionar IP IPv6 no servidor (interface do túnel) e 3. criar rota
+            # para o segundo bloco em um único script; a rota só é criada se o IP estiver ok
             server_ip_with_mask = f"{server_ip}/126"
             add_ip_cmd = f"/ipv6 address add address={server_ip_with_mask} interface={tunnel_interface} advertise=no"
+            route_cmd = f"/ipv6 route add dst-address={route_network} gateway={route_gateway} distance=1 check-gateway=ping comment=\"Route-{tunnel_name.upper()}\""
             
-            output = self.connection.execute_command(add_ip_cmd)
-            if output and ("syntax error" in output.lower() or "failure" in output.lower()):
-                if "already have such address" not in output.lower():
-                    logger.error(f"❌ Erro ao adicionar IP {server_ip_with_mask}: {output}")
-                    return False
-                else:
-                    logger.info(f"⚠️  IP {server_ip_with_mask} já existe no túnel")
-            else:
-                logger.info(f"✅ IP {server_ip_with_mask} adicionado ao túnel {tunnel_interface}")
+            script = "; ".join([
+                self._stage_script('ADDR', f'/ipv6 address find where interface="{tunnel_interface}" and address~"^{server_ip}/"', add_ip_cmd, abort_on_error=True),
+                self._stage_script('ROUTE', f'/ipv6 route find where dst-address={route_network} and gateway={route_gateway}', route_cmd)
+            ])
             
-            # 3. Criar rota para o segundo bloco
-            route_cmd = f"/ipv6 route add dst-address={route_network} gateway={route_gateway} distance=1 check-gateway=ping comment=\"Route-{tunnel_name.upper()}\""
+            output = self.connection.execute_command(script) or ''
+            status = {stage: state for state, stage in _STAGE_STATUS_RE.findall(output)}
             
-            output = self.connection.execute_command(route_cmd)
-            if output and ("syntax error" in output.lower() or "failure" in output.lower()):
-                if "already have such route" not in output.lower():
-                    logger.error(f"❌ Erro ao criar rota {route_network}: {output}")
-                    return False
-                else:
-                    logger.info(f"⚠️  Rota {route_network} já existe")
+            address_status = status.get('ADDR')
+            if address_status == 'OK':
+                logger.info("✅ IP %s adicionado ao túnel %s", server_ip_with_mask, tunnel_interface)
+            elif address_status == 'EXISTS':
+                logger.info("⚠️  IP %s já existe no túnel", server_ip_with_mask)
             else:
-                logger.info(f"✅ Rota {route_network} via {route_gateway} criada")
+                logger.error("❌ Erro ao adicionar IP %s: %s", server_ip_with_mask, output)
+                return False
+            
+            route_status = status.get('ROUTE')
+            if route_status == 'OK':
+                logger.info("✅ Rota %s via %s criada", route_network, route_gateway)
+            elif route_status == 'EXISTS':
+                logger.info("⚠️  Rota %s já existe", route_network)
+            else:
+                logger.error("❌ Erro ao criar rota %s: %s", route_network, output)
+                return False
             
             return True
             
         except Exception as e:
-            logger.error(f"❌ Erro ao configurar túnel servidor {tunnel_name}: {e}")
+            logger.error("❌ Erro ao configurar túnel servidor %s: %s", tunnel_name, e)
             return False
     
     def configure_l2tp_client(self, bridge_interface: str, bridge_ip: str, 
@@ -94,6 +202,10 @@ class MikrotikL2TPManager:
         Returns:
             bool: True se configurado com sucesso
         """
+        # Endereços inválidos são rejeitados antes de qualquer ida ao dispositivo
+        if not self._valid_ipv6(bridge_ip=bridge_ip, default_gateway=default_gateway):
+            return False
+        
         if not self.connection.is_connected():
             logger.error("❌ Conexão não estabelecida")
             return False
@@ -103,55 +215,46 @@ class MikrotikL2TPManager:
             if not self._interface_exists(bridge_interface):
                 # Listar bridges disponíveis para ajudar na configuração
                 available_bridges = self._list_available_bridges()
-                logger.error(f"❌ Interface {bridge_interface} não encontrada")
-                logger.info(f"🔍 Bridges disponíveis: {', '.join(available_bridges) if available_bridges else 'Nenhuma'}")
+                logger.error("❌ Interface %s não encontrada", bridge_interface)
+                logger.info("🔍 Bridges disponíveis: %s", ', '.join(available_bridges) if available_bridges else 'Nenhuma')
                 return False
             
-            # 2. Adicionar IP IPv6 na bridge
+            # 2. Adicionar IP IPv6 na bridge e 3. criar rota default em um único
+            # script, que verifica a existência e imprime um status por etapa
+            bridge_host = bridge_ip.partition('/')[0]
             add_ip_cmd = f"/ipv6 address add address={bridge_ip} interface={bridge_interface} advertise=no"
-            logger.info(f"🔧 Executando: {add_ip_cmd}")
+            default_route_cmd = f"/ipv6 route add dst-address=::/0 gateway={default_gateway} distance=1 comment=\"Default-via-L2TP\""
+            logger.info("🔧 Executando: %s", add_ip_cmd)
+            logger.info("🔧 Executando: %s", default_route_cmd)
             
-            output = self.connection.execute_command(add_ip_cmd)
-            logger.info(f"📤 Saída do comando: {repr(output)}")
+            script = "; ".join([
+                self._stage_script('ADDR', f'/ipv6 address find where interface={bridge_interface} and address~"^{bridge_host}/"', add_ip_cmd, abort_on_error=True),
+                self._stage_script('ROUTE', f'/ipv6 route find where dst-address=::/0 and gateway={default_gateway}', default_route_cmd)
+            ])
             
-            if output and ("syntax error" in output.lower() or "failure" in output.lower()):
-                if "already have such address" not in output.lower():
-                    logger.error(f"❌ Erro ao adicionar IP {bridge_ip}: {output}")
-                    return False
-                else:
-                    logger.info(f"⚠️  IP {bridge_ip} já existe na bridge")
-            else:
-                # Verificar se o IP foi realmente adicionado
-                verify_cmd = f"/ipv6 address print where interface={bridge_interface}"
-                verify_output = self.connection.execute_command(verify_cmd)
-                
-                if verify_output and bridge_ip.split('/')[0] in verify_output:
-                    logger.info(f"✅ IP {bridge_ip} confirmado na bridge {bridge_interface}")
-                else:
-                    logger.warning(f"⚠️  Não foi possível confirmar adição do IP {bridge_ip}")
+            output = self.connection.execute_command(script) or ''
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📤 Saída do comando: %r", output)
             
-            # 3. Criar rota default
-            default_route_cmd = f"/ipv6 route add dst-address=::/0 gateway={default_gateway} distance=1 comment=\"Default-via-L2TP\""
-            logger.info(f"🔧 Executando: {default_route_cmd}")
+            status = {stage: state for state, stage in _STAGE_STATUS_RE.findall(output)}
             
-            output = self.connection.execute_command(default_route_cmd)
-            logger.info(f"📤 Saída do comando: {repr(output)}")
+            address_status = status.get('ADDR')
+            if address_status == 'OK':
+                logger.info("✅ IP %s adicionado na bridge %s", bridge_ip, bridge_interface)
+            elif address_status == 'EXISTS':
+                logger.info("⚠️  IP %s já existe na bridge", bridge_ip)
+            else:
+                logger.error("❌ Erro ao adicionar IP %s: %s", bridge_ip, output)
+                return False
             
-            if output and ("syntax error" in output.lower() or "failure" in output.lower()):
-                if "already have such route" not in output.lower():
-                    logger.error(f"❌ Erro ao criar rota default: {output}")
-                    return False
-                else:
-                    logger.info(f"⚠️  Rota default já existe")
+            route_status = status.get('ROUTE')
+            if route_status == 'OK':
+                logger.info("✅ Rota default ::/0 via %s criada", default_gateway)
+            elif route_status == 'EXISTS':
+                logger.info("⚠️  Rota default já existe")
             else:
-                # Verificar se a rota foi realmente criada
-                verify_route_cmd = "/ipv6 route print where dst-address=::/0"
-                verify_route_output = self.connection.execute_command(verify_route_cmd)
-                
-                if verify_route_output and default_gateway in verify_route_output:
-                    logger.info(f"✅ Rota default ::/0 via {default_gateway} confirmada")
-                else:
-                    logger.warning(f"⚠️  Não foi possível confirmar criação da rota default")
+                logger.error("❌ Erro ao criar rota default: %s", output)
+                return False
             
             # 4. Executar testes de conectividade
             self._test_connectivity_after_config(bridge_interface, default_gateway)
@@ -159,9 +262,56 @@ class MikrotikL2TPManager:
             return True
             
         except Exception as e:
-            logger.error(f"❌ Erro ao configurar cliente L2TP: {e}")
+            logger.error("❌ Erro ao configurar cliente L2TP: %s", e)
             return False
     
+    def _valid_ipv6(self, **values: str) -> bool:
+        """
+        Valida localmente os parâmetros IPv6 de uma configuração
+        
+        Args:
+            values: Parâmetros por nome; nomes terminados em _network e valores
+                com prefixo (/) são validados como rede, os demais como endereço
+            
+        Returns:
+            bool: True se todos os valores são IPv6 válidos
+        """
+        for name, value in values.items():
+            try:
+                if name.endswith('_network') or '/' in str(value):
+                    ipaddress.IPv6Network(value, strict=False)
+                else:
+                    ipaddress.IPv6Address(value)
+            except ValueError:
+                logger.error("❌ Valor IPv6 inválido para %s: %s", name, value)
+                return False
+        
+        return True
+    
+    def _stage_script(self, stage: str, find_cmd: str, add_cmd: str,
+                      abort_on_error: bool = False) -> str:
+        """
+        Monta a etapa de um script RouterOS que adiciona um item se ainda não existir
+        
+        Args:
+            stage: Nome da etapa impresso no status (ex: ADDR)
+            find_cmd: Comando find que localiza o item já existente
+            add_cmd: Comando de adição
+            abort_on_error: Interrompe o script (etapas seguintes não rodam) se a adição falhar
+            
+        Returns:
+            str: Trecho de script que imprime OK, EXISTS ou ERR seguido de :<etapa>
+        """
+        on_error = f':put ("ERR:" . "{stage}")'
+        if abort_on_error:
+            on_error += f'; :error ("abort:" . "{stage}")'
+        
+        # Status montado por concatenação para não aparecer no eco do comando
+        return (
+            f':if ([:len [{find_cmd}]] > 0) do={{ :put ("EXISTS:" . "{stage}") }} '
+            f'else={{ :do {{ {add_cmd}; :put ("OK:" . "{stage}") }} on-error={{ {on_error} }} }}'
+        )
+    
     def _find_l2tp_tunnel_by_name(self, tunnel_name: str) -> Optional[str]:
         """
         Procura túnel L2TP pelo nome no servidor
@@ -173,37 +323,61 @@ class MikrotikL2TPManager:
             str: Nome da interface do túnel ou None se não encontrado
         """
         try:
-            # Listar interfaces L2TP Server
-            command = "/interface l2tp-server print"
-            output = self.connection.execute_command(command)
+            records = self._cached('l2tp_tunnels', self._TUNNELS_TTL, self._load_l2tp_tunnels)
             
-            if not output:
-                logger.warning("⚠️  Nenhuma resposta do comando l2tp-server print")
+            if records is None:
                 return None
             
             # Procurar túnel pelo nome (case-insensitive)
-            lines = output.split('\n')
+            needle = re.compile(re.escape(tunnel_name), re.IGNORECASE)
             
-            for line in lines:
-                line_lower = line.lower()
-                tunnel_name_lower = tunnel_name.lower()
+            for record in records:
+                interface_name = str(record.get('name', '')).strip('<>')
                 
-                # Procurar o nome do túnel na linha
-                if tunnel_name_lower in line_lower and 'l2tp-' in line_lower:
-                    # Extrair nome da interface
-                    match = re.search(r'<([^>]*l2tp[^>]*)>', line)
-                    if match:
-                        interface_name = match.group(1)
-                        logger.info(f"🎯 Túnel encontrado: {interface_name} para {tunnel_name}")
-                        return interface_name
-            
-            logger.warning(f"⚠️  Túnel '{tunnel_name}' não encontrado")
+                if not _L2TP_PREFIX_RE.search(interface_name):
+                    continue
+                
+                # Procurar o nome do túnel no nome da interface ou no usuário
+                if needle.search(interface_name) or needle.search(str(record.get('user', ''))):
+                    logger.info("🎯 Túnel encontrado: %s para %s", interface_name, tunnel_name)
+                    return interface_name
+            
+            logger.warning("⚠️  Túnel '%s' não encontrado", tunnel_name)
             return None
             
         except Exception as e:
-            logger.error(f"❌ Erro ao procurar túnel {tunnel_name}: {e}")
+            logger.error("❌ Erro ao procurar túnel %s: %s", tunnel_name, e)
             return None
     
+    def _load_l2tp_tunnels(self) -> Optional[List[Dict[str, object]]]:
+        """
+        Consulta nome e usuário de todos os túneis L2TP Server
+        
+        Returns:
+            List[Dict]: Registros dos túneis ou None se não houver resposta
+        """
+        # API RouterOS: túneis já estruturados em dicionários
+        records = self.connection.api_call('/interface/l2tp-server/print')
+        
+        if records is None:
+            # Sem API: apenas nome e usuário de cada túnel, separados por tab
+            command = (
+                ':foreach i in=[/interface l2tp-server find] do={ '
+                ':local t [/interface l2tp-server get $i]; :put (($t->"name") . "\\t" . ($t->"user")) }'
+            )
+            output = self.connection.execute_command(command)
+            
+            if not output:
+                logger.warning("⚠️  Nenhuma resposta da listagem de túneis l2tp-server")
+                return None
+            
+            records = []
+            for line in io.StringIO(output):
+                name, _, user = line.rstrip('\r\n').partition('\t')
+                records.append({'name': name.strip(), 'user': user})
+        
+        return records
+    
     def _interface_exists(self, interface_name: str) -> bool:
         """
         Verifica se uma interface existe
@@ -214,15 +388,16 @@ class MikrotikL2TPManager:
         Returns:
             bool: True se a interface existe
         """
-        try:
-            command = f"/interface print where name={interface_name}"
-            output = self.connection.execute_command(command)
-            
-            # Se retornou algo, a interface existe
-            return output and interface_name in output
-            
-        except Exception:
-            return False
+        return self._cached(f'iface:{interface_name}', self._IFACE_TTL,
+                            lambda: self._query_interface_exists(interface_name))
+    
+    def _query_interface_exists(self, interface_name: str) -> bool:
+        """Consulta no dispositivo se a interface existe"""
+        # Filtro aplicado no RouterOS: retorna apenas a contagem
+        command = f':put [:len [/interface find where name="{interface_name}"]]'
+        output = (self.connection.execute_command(command) or '').strip()
+        
+        return output.isdigit() and int(output) > 0
     
     def _list_available_bridges(self) -> List[str]:
         """
@@ -232,29 +407,24 @@ class MikrotikL2TPManager:
             List[str]: Lista com nomes das bridges
         """
         try:
-            command = "/interface bridge print"
-            output = self.connection.execute_command(command)
-            
-            if not output:
-                return []
-            
-            bridges = []
-            lines = output.split('\n')
-            
-            for line in lines:
-                # Procurar por padrão: número seguido de flags e name="nome"
-                if 'name=' in line and 'R' in line:  # R = running
-                    match = re.search(r'name="([^"]+)"', line)
-                    if match:
-                        bridge_name = match.group(1)
-                        bridges.append(bridge_name)
-            
-            return bridges
+            return list(self._cached('bridges', self._BRIDGES_TTL, self._load_bridges))
             
         except Exception as e:
-            logger.error(f"❌ Erro ao listar bridges: {e}")
+            logger.error("❌ Erro ao listar bridges: %s", e)
             return []
     
+    def _load_bridges(self) -> List[str]:
+        """Consulta os nomes das bridges em execução no dispositivo"""
+        # Apenas os nomes das bridges em execução, um por linha
+        command = ':foreach b in=[/interface bridge find where running] do={ :put [/interface bridge get $b name] }'
+        output = self.connection.execute_command(command)
+        
+        if not output:
+            return []
+        
+        stripped = (line.strip() for line in io.StringIO(output))
+        return [name for name in stripped if name]
+    
     def _test_connectivity_after_config(self, bridge_interface: str, gateway: str):
         """
         Executa testes de conectividade após configuração
@@ -266,19 +436,20 @@ class MikrotikL2TPManager:
         try:
             logger.info("🧪 Iniciando testes de conectividade pós-configuração...")
             
-            # Criar instância de testes
-            connectivity_tests = MikrotikConnectivityTests(self.connection)
+            # Instância de testes criada uma vez e reaproveitada
+            if self._connectivity_tests is None:
+                self._connectivity_tests = MikrotikConnectivityTests(self.connection)
             
             # Executar testes completos
-            test_results = connectivity_tests.test_ipv6_connectivity(
+            test_results = self._connectivity_tests.test_ipv6_connectivity(
                 gateway=gateway,
-                test_targets=["2001:4860:4860::8888", "2001:4860:4860::8844"]  # Google DNS IPv6
+                test_targets=_CONNECTIVITY_TEST_TARGETS
             )
             
             logger.info("✅ Testes de conectividade concluídos")
             
         except Exception as e:
-            logger.error(f"❌ Erro nos testes de conectividade: {e}")
+            logger.error("❌ Erro nos testes de conectividade: %s", e)
     
     def list_l2tp_server_tunnels(self) -> List[Dict[str, str]]:
         """
@@ -288,44 +459,38 @@ class MikrotikL2TPManager:
             List[Dict]: Lista de túneis com informações
         """
         try:
-            command = "/interface l2tp-server print"
+            # Apenas túneis em execução: nome, usuário e IP do cliente separados por tab
+            command = (
+                ':foreach i in=[/interface l2tp-server find where running] do={ '
+                ':local t [/interface l2tp-server get $i]; '
+                ':put (($t->"name") . "\\t" . ($t->"user") . "\\t" . ($t->"client-address")) }'
+            )
             output = self.connection.execute_command(command)
             
             if not output:
                 return []
             
             tunnels = []
-            lines = output.split('\n')
-            
-            for line in lines:
-                if 'l2tp-' in line.lower() and ('R' in line or 'running' in line.lower()):
-                    # Extrair informações do túnel
-                    match = re.search(r'<([^>]*l2tp[^>]*)>', line)
-                    if match:
-                        tunnel_name = match.group(1)
-                        
-                        # Tentar extrair usuário e IP cliente
-                        parts = line.split()
-                        user = ""
-                        client_ip = ""
-                        
-                        for i, part in enumerate(parts):
-                            if re.match(r'\d+\.\d+\.\d+\.\d+', part):
-                                client_ip = part
-                                if i > 0:
-                                    user = parts[i-1]
-                                break
-                        
-                        tunnels.append({
-                            'interface': tunnel_name,
-                            'user': user,
-                            'client_ip': client_ip,
-                            'status': 'running'
-                        })
-            
-            logger.info(f"📡 Encontrados {len(tunnels)} túneis L2TP ativos")
+            
+            for line in io.StringIO(output):
+                parts = line.rstrip('\r\n').split('\t')
+                if len(parts) != 3:
+                    continue
+                
+                name, user, client_ip = parts
+                tunnel_name = name.strip().strip('<>')
+                
+                if _L2TP_PREFIX_RE.search(tunnel_name):
+                    tunnels.append({
+                        'interface': tunnel_name,
+                        'user': user,
+                        'client_ip': client_ip,
+                        'status': 'running'
+                    })
+            
+            logger.info("📡 Encontrados %s túneis L2TP ativos", len(tunnels))
             return tunnels
             
         except Exception as e:
-            logger.error(f"❌ Erro ao listar túneis L2TP: {e}")
+            logger.error("❌ Erro ao listar túneis L2TP: %s", e)
             return [] 
\ No newline at end of file
@@ -4,13 +4,51 @@ Módulo de Rotas IPv6 - Mikrotik Automation
 Responsável por configurar rotas IPv6
 """
 
+import io
+import ipaddress
 import logging
 import re
-from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import List, Dict, Optional, Set, Tuple, Union
 from .mikrotik_connection import MikrotikConnection
+from .mikrotik_api import MikrotikAPIError
 
 logger = logging.getLogger(__name__)
 
+# ID interno RouterOS retornado por [find] (ex: *1A)
+_ITEM_ID_RE = re.compile(r'\*[0-9A-Fa-f]+')
+
+# Colunas de uma configuração de rota e seus valores padrão
+_ROUTE_COLUMNS = (
+    ('dst_address', None),
+    ('gateway', None),
+    ('distance', 1),
+    ('check_gateway', 'ping'),
+    ('comment', None)
+)
+
+# Lotes de rotas enviados em paralelo, abaixo do MaxStartups padrão do SSH (10)
+_MAX_ROUTE_WORKERS = 8
+# Rotas por lote (um script por ida ao dispositivo)
+_ROUTE_BATCH_SIZE = 8
+# Acima deste número de rotas, o lote registra resumos em vez de uma linha por rota
+_ROUTE_LOG_EACH_LIMIT = 50
+
+@dataclass(slots=True)
+class Route:
+    """Rota IPv6 configurada no dispositivo"""
+    id: str = ''
+    flags: str = ''
+    dst_address: str = ''
+    gateway: str = ''
+    distance: str = ''
+    comment: str = ''
+    
+    def to_dict(self) -> Dict[str, str]:
+        """Retorna a rota no formato de dicionário"""
+        return asdict(self)
+
 class MikrotikRoutes:
     """Classe para gerenciar rotas IPv6 em dispositivos Mikrotik"""
     
@@ -32,6 +70,11 @@ class MikrotikRoutes:
         Returns:
             bool: True se configurado com sucesso, False caso contrário
         """
+        # Endereços inválidos são rejeitados antes de qualquer ida ao dispositivo
+        if not self._is_valid_route(dst_address, gateway):
+            logger.error("❌ Rota inválida: %s via %s", dst_address, gateway)
+            return False
+        
         if not self.connection.is_connected():
             logger.error("❌ Conexão não estabelecida")
             return False
@@ -39,33 +82,81 @@ class MikrotikRoutes:
         try:
             # Verificar se a rota já existe
             if self._route_exists(dst_address, gateway):
-                logger.warning(f"⚠️  Rota para {dst_address} via {gateway} já existe")
+                logger.warning("⚠️  Rota para %s via %s já existe", dst_address, gateway)
                 return True
             
-            # Construir comando
-            command = f"/ipv6 route add dst-address={dst_address} gateway={gateway} distance={distance}"
+            return self._add_ipv6_route_no_check(dst_address, gateway, distance, check_gateway, comment)
+            
+        except Exception as e:
+            logger.error("❌ Erro ao adicionar rota %s via %s: %s", dst_address, gateway, e)
+            return False
+    
+    def _add_ipv6_route_no_check(self, dst_address: str, gateway: str, distance: int = 1,
+                                 check_gateway: str = "ping", comment: str = None) -> bool:
+        """Adiciona uma rota IPv6 sem verificar antes se ela já existe"""
+        try:
+            params = {'dst-address': dst_address, 'gateway': gateway, 'distance': distance}
             
             if check_gateway:
-                command += f" check-gateway={check_gateway}"
+                params['check-gateway'] = check_gateway
             
             if comment:
-                command += f" comment=\"{comment}\""
+                params['comment'] = comment
             
-            # Executar comando
+            try:
+                # API RouterOS: erro retornado como trap, sem interpretar o texto do terminal
+                if self.connection.api_call('/ipv6/route/add', **params) is not None:
+                    logger.info("✅ Rota IPv6 %s via %s adicionada", dst_address, gateway)
+                    return True
+            except MikrotikAPIError as e:
+                if 'already have' in e.message:
+                    logger.warning("⚠️  Rota para %s via %s já existe", dst_address, gateway)
+                    return True
+                logger.error("❌ Erro ao adicionar rota %s via %s: %s", dst_address, gateway, e.message)
+                return False
+            
+            # Sem API: comando do CLI
+            command = self._route_add_command(dst_address, gateway, distance, check_gateway, comment)
             output = self.connection.execute_command(command)
             
             # Verificar se houve erro
-            if output and ("syntax error" in output.lower() or "failure" in output.lower()):
-                logger.error(f"❌ Erro ao adicionar rota {dst_address} via {gateway}: {output}")
+            if self._route_add_failed(output):
+                logger.error("❌ Erro ao adicionar rota %s via %s: %s", dst_address, gateway, output)
                 return False
             
-            logger.info(f"✅ Rota IPv6 {dst_address} via {gateway} adicionada")
+            logger.info("✅ Rota IPv6 %s via %s adicionada", dst_address, gateway)
             return True
             
         except Exception as e:
-            logger.error(f"❌ Erro ao adicionar rota {dst_address} via {gateway}: {e}")
+            logger.error("❌ Erro ao adicionar rota %s via %s: %s", dst_address, gateway, e)
+            return False
+    
+    def _is_valid_route(self, dst_address: str, gateway: str) -> bool:
+        """Valida localmente o destino (rede IPv6) e o gateway (endereço IPv6)"""
+        try:
+            ipaddress.IPv6Network(dst_address, strict=False)
+            ipaddress.IPv6Address(gateway)
+            return True
+        except ValueError:
             return False
     
+    def _route_add_command(self, dst_address: str, gateway: str, distance: int = 1,
+                           check_gateway: str = "ping", comment: str = None) -> str:
+        """Monta o comando CLI de adição de rota IPv6"""
+        command = f"/ipv6 route add dst-address={dst_address} gateway={gateway} distance={distance}"
+        
+        if check_gateway:
+            command += f" check-gateway={check_gateway}"
+        
+        if comment:
+            command += f" comment=\"{comment}\""
+        
+        return command
+    
+    def _route_add_failed(self, output: Optional[str]) -> bool:
+        """Verifica se a saída do comando de adição indica erro"""
+        return bool(output) and ("syntax error" in output.lower() or "failure" in output.lower())
+    
     def remove_ipv6_route(self, dst_address: str, gateway: str = None) -> bool:
         """
         Remove uma rota IPv6
@@ -86,7 +177,7 @@ class MikrotikRoutes:
             route_id = self._find_route_id(dst_address, gateway)
             
             if not route_id:
-                logger.warning(f"⚠️  Rota {dst_address} não encontrada")
+                logger.warning("⚠️  Rota %s não encontrada", dst_address)
                 return True  # Já não existe
             
             # Remover rota
@@ -94,17 +185,17 @@ class MikrotikRoutes:
             output = self.connection.execute_command(command)
             
             if output and ("syntax error" in output.lower() or "failure" in output.lower()):
-                logger.error(f"❌ Erro ao remover rota {dst_address}: {output}")
+                logger.error("❌ Erro ao remover rota %s: %s", dst_address, output)
                 return False
             
-            logger.info(f"🗑️  Rota IPv6 {dst_address} removida")
+            logger.info("🗑️  Rota IPv6 %s removida", dst_address)
             return True
             
         except Exception as e:
-            logger.error(f"❌ Erro ao remover rota {dst_address}: {e}")
+            logger.error("❌ Erro ao remover rota %s: %s", dst_address, e)
             return False
     
-    def list_ipv6_routes(self, dst_address: str = None) -> List[Dict[str, str]]:
+    def list_ipv6_routes(self, dst_address: str = None) -> List[Route]:
         """
         Lista rotas IPv6 configuradas
         
@@ -112,155 +203,132 @@ class MikrotikRoutes:
             dst_address: Filtrar por endereço de destino específico (opcional)
             
         Returns:
-            List[Dict]: Lista de rotas IPv6
+            List[Route]: Lista de rotas IPv6
         """
         if not self.connection.is_connected():
             logger.error("❌ Conexão não estabelecida")
             return []
         
         try:
-            # Comando para listar rotas IPv6
-            command = "/ipv6 route print"
-            if dst_address:
-                command += f" where dst-address={dst_address}"
+            # API RouterOS: registros já estruturados, sem parse de texto
+            queries = [f"?dst-address={dst_address}"] if dst_address else []
+            records = self.connection.api_call('/ipv6/route/print', *queries)
             
-            output = self.connection.execute_command(command)
-            
-            if not output:
-                logger.warning("⚠️  Nenhuma resposta do comando ipv6 route print")
-                return []
-            
-            routes = self._parse_ipv6_routes(output)
+            if records is not None:
+                routes = [self._route_from_api(record) for record in records]
+            else:
+                routes = self._list_ipv6_routes_cli(dst_address)
             
             if dst_address:
-                logger.info(f"📋 Encontradas {len(routes)} rotas para {dst_address}")
+                logger.info("📋 Encontradas %s rotas para %s", len(routes), dst_address)
             else:
-                logger.info(f"📋 Encontradas {len(routes)} rotas IPv6 total")
+                logger.info("📋 Encontradas %s rotas IPv6 total", len(routes))
             
             return routes
             
         except Exception as e:
-            logger.error(f"❌ Erro ao listar rotas IPv6: {e}")
+            logger.error("❌ Erro ao listar rotas IPv6: %s", e)
+            return []
+    
+    def _list_ipv6_routes_cli(self, dst_address: str = None) -> List[Route]:
+        """Lista rotas IPv6 pelo CLI, quando a API não está disponível"""
+        find = "/ipv6 route find"
+        if dst_address:
+            find += f" where dst-address={dst_address}"
+        
+        # Um registro por linha, campos separados por tab (o print comum sai em colunas)
+        command = (
+            f':foreach i in=[{find}] do={{ '
+            ':local r [/ipv6 route get $i]; '
+            ':put ("$i\\t" . ($r->"dst-address") . "\\t" . ($r->"gateway") . "\\t" . '
+            '($r->"distance") . "\\t" . ($r->"comment")) }'
+        )
+        
+        output = self.connection.execute_command(command)
+        
+        # Saída vazia é uma tabela sem rotas; None indica erro no comando
+        if output is None:
+            logger.warning("⚠️  Nenhuma resposta da listagem de rotas IPv6")
             return []
+        
+        return self._parse_route_records(output)
+    
+    def _route_from_api(self, record: Dict[str, object]) -> Route:
+        """Converte um registro da API para o formato de rota usado no módulo"""
+        return Route(
+            id=str(record.get('.id', '')),
+            flags=('X' if record.get('disabled') else '') + ('D' if record.get('dynamic') else ''),
+            dst_address=str(record.get('dst-address', '')),
+            gateway=str(record.get('gateway', '')),
+            distance=str(record.get('distance', '')),
+            comment=str(record.get('comment', ''))
+        )
+    
+    def _route_filter(self, dst_address: str, gateway: str = None) -> str:
+        """Monta filtro RouterOS por destino e, opcionalmente, gateway"""
+        route_filter = f"dst-address={dst_address}"
+        if gateway:
+            route_filter += f" and gateway={gateway}"
+        return route_filter
     
     def _route_exists(self, dst_address: str, gateway: str) -> bool:
-        """Verifica se uma rota IPv6 já existe"""
-        try:
-            routes = self.list_ipv6_routes()
-            
-            for route in routes:
-                if (route.get('dst_address') == dst_address and 
-                    route.get('gateway') == gateway):
-                    return True
-            
-            return False
-            
-        except Exception:
-            return False
+        """Verifica se uma rota IPv6 já existe (erros são tratados pelo chamador)"""
+        # Filtro aplicado no RouterOS: retorna apenas a contagem
+        command = f":put [:len [/ipv6 route find where {self._route_filter(dst_address, gateway)}]]"
+        output = (self.connection.execute_command(command) or '').strip()
+        
+        return output.isdigit() and int(output) > 0
+    
+    def _load_route_index(self) -> Set[Tuple[str, str]]:
+        """Carrega a tabela de rotas uma única vez como conjunto de (destino, gateway)"""
+        return {(route.dst_address, route.gateway) for route in self.list_ipv6_routes()}
     
     def _find_route_id(self, dst_address: str, gateway: str = None) -> Optional[str]:
-        """Encontra o ID de uma rota IPv6 específica"""
-        try:
-            routes = self.list_ipv6_routes()
-            
-            for route in routes:
-                if route.get('dst_address') == dst_address:
-                    if gateway is None or route.get('gateway') == gateway:
-                        return route.get('id')
-            
-            return None
-            
-        except Exception:
-            return None
+        """Encontra o ID de uma rota IPv6 específica (erros são tratados pelo chamador)"""
+        # Apenas o ID interno é retornado, sem listar a tabela inteira
+        command = f":put [/ipv6 route find where {self._route_filter(dst_address, gateway)}]"
+        output = self.connection.execute_command(command)
+        
+        match = _ITEM_ID_RE.search(output) if output else None
+        return match.group(0) if match else None
     
-    def _parse_ipv6_routes(self, output: str) -> List[Dict[str, str]]:
+    def _parse_route_records(self, output: str) -> List[Route]:
         """
-        Faz parse da saída do comando ipv6 route print
+        Faz parse da listagem filtrada de rotas (um registro por linha, campos separados por tab)
         
         Args:
-            output: Saída do comando RouterOS
+            output: Saída do script de listagem
             
         Returns:
-            List[Dict]: Lista de rotas parseadas
+            List[Route]: Lista de rotas parseadas
         """
         routes = []
-        lines = output.split('\n')
-        
-        current_route = {}
         
-        for line in lines:
-            line = line.strip()
-            
-            # Pular linhas vazias e headers
-            if not line or 'Flags:' in line:
+        for line in io.StringIO(output):
+            parts = line.rstrip('\r\n').split('\t')
+            if len(parts) != 5:
                 continue
             
-            # Nova entrada de rota (linha com número)
-            if re.match(r'^\s*\d+', line):
-                # Salvar rota anterior se existir
-                if current_route:
-                    routes.append(current_route)
-                    current_route = {}
-                
-                # Parse da nova linha
-                parts = line.split()
-                if len(parts) >= 1:
-                    current_route = {
-                        'id': parts[0],
-                        'flags': '',
-                        'dst_address': '',
-                        'gateway': '',
-                        'distance': '',
-                        'comment': ''
-                    }
-                
-                # Extrair informações da linha
-                if 'dst-address=' in line:
-                    dst_match = re.search(r'dst-address=([^\s]+)', line)
-                    if dst_match:
-                        current_route['dst_address'] = dst_match.group(1)
-                
-                if 'gateway=' in line:
-                    gw_match = re.search(r'gateway=([^\s]+)', line)
-                    if gw_match:
-                        current_route['gateway'] = gw_match.group(1)
-                
-                if 'distance=' in line:
-                    dist_match = re.search(r'distance=([^\s]+)', line)
-                    if dist_match:
-                        current_route['distance'] = dist_match.group(1)
-                
-                if 'comment=' in line:
-                    comment_match = re.search(r'comment=([^\s]+)', line)
-                    if comment_match:
-                        current_route['comment'] = comment_match.group(1).strip('"')
+            route_id, dst_address, gateway, distance, comment = parts
             
-            # Linha de continuação
-            elif line and current_route:
-                # Procurar por informações de rota que podem estar em linhas separadas
-                if 'dst-address=' in line:
-                    dst_match = re.search(r'dst-address=([^\s]+)', line)
-                    if dst_match:
-                        current_route['dst_address'] = dst_match.group(1)
-                
-                if 'gateway=' in line:
-                    gw_match = re.search(r'gateway=([^\s]+)', line)
-                    if gw_match:
-                        current_route['gateway'] = gw_match.group(1)
-        
-        # Adicionar última rota
-        if current_route:
-            routes.append(current_route)
+            routes.append(Route(route_id.strip(), '', dst_address, gateway, distance, comment))
         
         return routes
     
-    def bulk_configure_routes(self, route_configs: List[Dict]) -> Tuple[int, int]:
+    def bulk_configure_routes(self, route_configs: Union[List[Dict], Dict[str, List]],
+                              max_workers: int = None) -> Tuple[int, int]:
         """
         Configura múltiplas rotas IPv6
         
+        As rotas novas são enviadas em lotes de comandos, com vários lotes em
+        paralelo quando a conexão permite (SSH).
+        
         Args:
             route_configs: Lista de configurações de rotas
                 [{'dst_address': '2804:385c:8700::14/126', 'gateway': '2804:385c:8700::12', 'comment': 'CAETITE'}]
+                ou as mesmas configurações em colunas
+                {'dst_address': [...], 'gateway': [...], 'comment': [...]}
+            max_workers: Máximo de lotes simultâneos (padrão e limite: 8)
         
         Returns:
             Tuple[int, int]: (sucessos, falhas)
@@ -268,24 +336,130 @@ class MikrotikRoutes:
         success_count = 0
         failure_count = 0
         
-        for config in route_configs:
-            dst_address = config.get('dst_address')
-            gateway = config.get('gateway')
-            distance = config.get('distance', 1)
-            check_gateway = config.get('check_gateway', 'ping')
-            comment = config.get('comment')
+        columns = self._normalize_configs(route_configs)
+        total = len(columns['dst_address'])
+        
+        if not self.connection.is_connected():
+            logger.error("❌ Conexão não estabelecida")
+            return 0, total
+        
+        # Validação local de todas as linhas de uma vez, sem ida ao dispositivo
+        valid = [self._is_valid_route(dst, gw) for dst, gw in zip(columns['dst_address'], columns['gateway'])]
+        invalid = [i for i, ok in enumerate(valid) if not ok]
+        
+        if invalid:
+            logger.error("❌ %s configurações de rota inválidas (posições %s)", len(invalid), invalid)
+            failure_count += len(invalid)
+        
+        # Tabela de rotas consultada uma única vez para todo o lote
+        route_index = self._load_route_index()
+        pending = []
+        existing_count = 0
+        log_each = total <= _ROUTE_LOG_EACH_LIMIT
+        
+        rows = zip(*(columns[key] for key, _ in _ROUTE_COLUMNS))
+        for ok, row in zip(valid, rows):
+            if not ok:
+                continue
             
-            if not dst_address or not gateway:
-                logger.error(f"❌ Configuração de rota inválida: {config}")
-                failure_count += 1
+            dst_address, gateway = row[0], row[1]
+            
+            if (dst_address, gateway) in route_index:
+                if log_each:
+                    logger.warning("⚠️  Rota para %s via %s já existe", dst_address, gateway)
+                existing_count += 1
                 continue
             
-            success = self.add_ipv6_route(dst_address, gateway, distance, check_gateway, comment)
+            route_index.add((dst_address, gateway))
+            pending.append(row)
+        
+        if existing_count:
+            success_count += existing_count
+            if not log_each:
+                logger.warning("⚠️  %s rotas já existiam", existing_count)
+        
+        batches = [pending[i:i + _ROUTE_BATCH_SIZE] for i in range(0, len(pending), _ROUTE_BATCH_SIZE)]
+        
+        if batches:
+            workers = min(max_workers or _MAX_ROUTE_WORKERS, _MAX_ROUTE_WORKERS, len(batches))
             
-            if success:
-                success_count += 1
+            # Telnet e canal shell têm um único fluxo: lotes em sequência
+            if not self.connection.supports_concurrent_batches:
+                workers = 1
+            
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self._add_routes_batch, batch, log_each) for batch in batches]
+                
+                for future in as_completed(futures):
+                    added, failed = future.result()
+                    success_count += added
+                    failure_count += failed
+        
+        logger.info("📊 Configuração de rotas em lote: %s sucessos, %s falhas", success_count, failure_count)
+        return success_count, failure_count
+    
+    def _normalize_configs(self, route_configs: Union[List[Dict], Dict[str, List]]) -> Dict[str, List]:
+        """
+        Converte as configurações de rotas para colunas (uma lista por campo)
+        
+        Args:
+            route_configs: Lista de dicionários ou dicionário de colunas
+            
+        Returns:
+            Dict[str, List]: Colunas de mesmo tamanho, com os valores padrão preenchidos
+        """
+        if isinstance(route_configs, dict):
+            total = len(route_configs.get('dst_address') or ())
+            return {
+                key: list(route_configs[key]) if key in route_configs else [default] * total
+                for key, default in _ROUTE_COLUMNS
+            }
+        
+        columns = {key: [] for key, _ in _ROUTE_COLUMNS}
+        fields = [(columns[key].append, key, default) for key, default in _ROUTE_COLUMNS]
+        
+        # Transposição em uma única passada
+        for config in route_configs:
+            for append, key, default in fields:
+                append(config.get(key, default))
+        
+        return columns
+    
+    def _add_routes_batch(self, batch: List[Tuple], log_each: bool = True) -> Tuple[int, int]:
+        """
+        Adiciona um lote de rotas com uma única execução de comandos
+        
+        Args:
+            batch: Linhas (destino, gateway, distância, check-gateway, comentário)
+                já validadas e ausentes no dispositivo
+            log_each: Registrar cada rota adicionada (senão, um resumo do lote)
+            
+        Returns:
+            Tuple[int, int]: (sucessos, falhas)
+        """
+        commands = [self._route_add_command(*row) for row in batch]
+        
+        try:
+            outputs = self.connection.execute_commands(commands)
+        except Exception as e:
+            logger.error("❌ Erro ao adicionar lote de %s rotas: %s", len(batch), e)
+            return 0, len(batch)
+        
+        success_count = 0
+        
+        for (dst_address, gateway, *_), output in zip(batch, outputs):
+            if output is None:
+                # Lote não executado (timeout, canal fechado) ou comando sem resposta
+                logger.error("❌ Sem resposta ao adicionar rota %s via %s", dst_address, gateway)
+            elif self._route_add_failed(output):
+                logger.error("❌ Erro ao adicionar rota %s via %s: %s", dst_address, gateway, output)
             else:
-                failure_count += 1
+                if log_each:
+                    logger.info("✅ Rota IPv6 %s via %s adicionada", dst_address, gateway)
+                success_count += 1
+        
+        if not log_each:
+            logger.info("📦 Lote de %s rotas: %s adicionadas, %s falhas",
+                        len(batch), success_count, len(batch) - success_count)
         
-        logger.info(f"📊 Configuração de rotas em lote: {success_count} sucessos, {failure_count} falhas")
-        return success_count, failure_count 
\ No newline at end of file
+        return success_count, len(batch) - success_count 
\ No newline at end of file
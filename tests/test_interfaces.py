@@ -0,0 +1,90 @@
+"""Parse da saída do l2tp-server print (fatiamento por coluna e fallbacks)"""
+
+import pytest
+
+# modules/__init__ importa o paramiko; sem ele não há o que testar
+pytest.importorskip("paramiko")
+
+from modules.mikrotik_interfaces import (
+    L2TPServerIface, MikrotikInterfaces, _server_columns, _slice_l2tp_server_row, _split_l2tp_server_row
+)
+
+# Saída capturada de /interface l2tp-server print (RouterOS 6.49)
+SERVER_PRINT = (
+    "Flags: X - disabled, D - dynamic, R - running \r\n"
+    " #     NAME                USER            MTU CLIENT-ADDRESS  UPTIME   ENCODING                  \r\n"
+    " 0  DR <l2tp-caetite>      caetite        1450 10.0.0.2        1d2h3m   cbc(aes) + hmac(sha1)     \r\n"
+    " 1  D  <l2tp-guanambi>     guanambi       1450 10.0.0.3                                           \r\n"
+    " 2  DR <l2tp-vitoria-da-conquista-centro> vdc-centro 1400 10.0.0.4 5m  cbc(aes) + hmac(sha1)\r\n"
+    " 3  DR <l2tp-brumado>      brumado        1450 10.0.0.5        12s      \r\n"
+)
+
+HEADER = SERVER_PRINT.splitlines()[1]
+
+
+def test_server_columns_from_header():
+    assert _server_columns(HEADER) == (7, 27, 47, 63)
+
+
+def test_server_columns_last_column_is_open_ended():
+    header = " #     NAME                USER            MTU CLIENT-ADDRESS"
+    assert _server_columns(header) == (7, 27, 47, None)
+
+
+def test_server_columns_unexpected_header():
+    assert _server_columns(" #     NAME    MTU") is None
+
+
+def test_slice_aligned_row():
+    row = SERVER_PRINT.splitlines()[2]
+    assert _slice_l2tp_server_row(row, _server_columns(HEADER)) == (
+        '0', 'DR', 'l2tp-caetite', 'caetite', '1450', '10.0.0.2'
+    )
+
+
+def test_slice_misaligned_row_is_rejected():
+    # Nome maior que a coluna empurra os demais campos para fora do lugar
+    row = SERVER_PRINT.splitlines()[4]
+    assert _slice_l2tp_server_row(row, _server_columns(HEADER)) is None
+
+
+def test_split_handles_misaligned_row():
+    row = SERVER_PRINT.splitlines()[4].strip()
+    assert _split_l2tp_server_row(row) == (
+        '2', 'DR', 'l2tp-vitoria-da-conquista-centro', 'vdc-centro', '1400', '10.0.0.4'
+    )
+
+
+def test_split_rejects_unexpected_rows():
+    assert _split_l2tp_server_row("Flags: X - disabled, D - dynamic, R - running") is None
+    assert _split_l2tp_server_row("0  DR l2tp-caetite caetite 1450 10.0.0.2") is None
+    assert _split_l2tp_server_row("0  DQ <l2tp-caetite> caetite 1450 10.0.0.2") is None
+    assert _split_l2tp_server_row("0  DR <l2tp-caetite> caetite auto 10.0.0.2") is None
+
+
+def test_parse_server_output_keeps_running_interfaces():
+    interfaces = MikrotikInterfaces(None)._parse_l2tp_server_output(SERVER_PRINT)
+    
+    assert interfaces == [
+        L2TPServerIface('0', 'DR', 'l2tp-caetite', 'caetite', '1450', '10.0.0.2'),
+        L2TPServerIface('2', 'DR', 'l2tp-vitoria-da-conquista-centro', 'vdc-centro', '1400', '10.0.0.4'),
+        L2TPServerIface('3', 'DR', 'l2tp-brumado', 'brumado', '1450', '10.0.0.5'),
+    ]
+
+
+def test_parse_server_output_without_usable_header():
+    # Header sem as colunas esperadas: todas as linhas seguem pelos fallbacks
+    output = (
+        "CLIENT-ADDRESS\n"
+        " 0  DR <l2tp-caetite> caetite 1450 10.0.0.2\n"
+        " 1  DR <l2tp-brumado>   brumado   1450   10.0.0.5   12s\n"
+    )
+    
+    interfaces = MikrotikInterfaces(None)._parse_l2tp_server_output(output)
+    
+    assert [iface.name for iface in interfaces] == ['l2tp-caetite', 'l2tp-brumado']
+    assert interfaces[1].client_address == '10.0.0.5'
+
+
+def test_parse_server_output_without_header():
+    assert MikrotikInterfaces(None)._parse_l2tp_server_output("no such item\n") == [] 
\ No newline at end of file
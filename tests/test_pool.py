@@ -0,0 +1,100 @@
+"""Pool de sessões SSH: reconexão após erro de canal ou de transporte"""
+
+import threading
+import time
+
+import pytest
+
+# modules/__init__ importa o paramiko; sem ele não há o que testar
+pytest.importorskip("paramiko")
+
+from modules.mikrotik_connection import MikrotikConnection
+
+KEY = ('10.0.0.1', 22, 'admin')
+
+
+class FakeTransport:
+    def __init__(self):
+        self.active = True
+    
+    def is_active(self) -> bool:
+        return self.active
+
+
+class FakeClient:
+    """Sessão SSH do pool (mesma interface usada de _TransportClient)"""
+    
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.closed = False
+    
+    def get_transport(self):
+        return self.transport
+    
+    def close(self):
+        self.closed = True
+        self.transport.active = False
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Substitui a abertura de transporte por sessões falsas, contando as aberturas"""
+    clients = []
+    
+    def open_transport(self, host, port, timeout):
+        time.sleep(0.05)
+        clients.append(FakeClient())
+        return clients[-1]
+    
+    monkeypatch.setattr(MikrotikConnection, '_open_transport', open_transport)
+    yield clients
+    MikrotikConnection.shutdown_pool()
+
+
+def _connection():
+    connection = MikrotikConnection('admin', 'secret', use_shell=False)
+    assert connection.connect_ssh(KEY[0], KEY[1], timeout=5)
+    return connection
+
+
+def test_connections_share_pooled_transport(opened):
+    first, second = _connection(), _connection()
+    
+    assert first.connection is second.connection
+    assert len(opened) == 1
+
+
+def test_channel_error_keeps_pooled_transport(opened):
+    first, second = _connection(), _connection()
+    
+    assert first._reconnect_ssh()
+    
+    assert not opened[0].closed
+    assert first.connection is second.connection is opened[0]
+    assert MikrotikConnection._pool[KEY] is opened[0]
+    assert len(opened) == 1
+
+
+def test_dead_transport_is_replaced(opened):
+    connection = _connection()
+    opened[0].transport.active = False
+    
+    assert connection._reconnect_ssh()
+    
+    assert opened[0].closed
+    assert connection.connection is opened[1]
+    assert MikrotikConnection._pool[KEY] is opened[1]
+
+
+def test_concurrent_reconnects_open_one_transport(opened):
+    connections = [_connection() for _ in range(4)]
+    opened[0].transport.active = False
+    
+    threads = [threading.Thread(target=connection._reconnect_ssh) for connection in connections]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(opened) == 2
+    assert all(connection.connection is opened[1] for connection in connections) 
\ No newline at end of file
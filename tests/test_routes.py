@@ -0,0 +1,113 @@
+"""Rotas IPv6: listagem pelo CLI e configuração em lote"""
+
+import pytest
+
+# modules/__init__ importa o paramiko; sem ele não há o que testar
+pytest.importorskip("paramiko")
+
+from modules.mikrotik_routes import MikrotikRoutes, Route
+
+
+class FakeConnection:
+    """Conexão que registra os comandos e responde com saídas pré-definidas"""
+    
+    supports_concurrent_batches = False
+    
+    def __init__(self, listing='', batch_outputs=None):
+        self.listing = listing
+        self.batch_outputs = batch_outputs
+        self.commands = []
+        self.batches = []
+    
+    def is_connected(self):
+        return True
+    
+    def api_call(self, path, *queries, **params):
+        return None
+    
+    def execute_command(self, command, timeout=30):
+        self.commands.append(command)
+        return self.listing
+    
+    def execute_commands(self, commands, timeout=30):
+        self.batches.append(commands)
+        if self.batch_outputs is None:
+            return [''] * len(commands)
+        return self.batch_outputs(commands)
+
+
+ROUTE_CONFIGS = [
+    {'dst_address': '2804:385c:8700::14/126', 'gateway': '2804:385c:8700::12', 'comment': 'CAETITE'},
+    {'dst_address': '2804:385c:8700::18/126', 'gateway': '2804:385c:8700::16', 'comment': 'BRUMADO'},
+]
+
+
+def test_bulk_routes_added():
+    connection = FakeConnection()
+    
+    assert MikrotikRoutes(connection).bulk_configure_routes(ROUTE_CONFIGS) == (2, 0)
+    assert len(connection.batches) == 1 and len(connection.batches[0]) == 2
+
+
+def test_bulk_routes_failed_batch_counts_as_failure():
+    # execute_commands devolve None para todo o lote quando ele não é executado
+    connection = FakeConnection(batch_outputs=lambda commands: [None] * len(commands))
+    
+    assert MikrotikRoutes(connection).bulk_configure_routes(ROUTE_CONFIGS) == (0, 2)
+
+
+def test_bulk_routes_device_error_counts_as_failure():
+    connection = FakeConnection(batch_outputs=lambda commands: ['', 'failure: already have such route'])
+    
+    assert MikrotikRoutes(connection).bulk_configure_routes(ROUTE_CONFIGS) == (1, 1) 
+
+
+# Saída capturada do script de listagem (um registro por linha, campos separados por tab)
+ROUTE_RECORDS = (
+    "*1\t::/0\t2804:385c:8700::12\t1\tDefault-via-L2TP\r\n"
+    "*2\t2804:385c:8700::14/126\t2804:385c:8700::12\t1\tRoute-CAETITE\r\n"
+    "*3\t2804:385c:8700::1c/126\t2804:385c:8700::1a\t2\t\r\n"
+)
+
+
+def test_list_routes_cli_uses_record_script():
+    connection = FakeConnection(listing=ROUTE_RECORDS)
+    
+    routes = MikrotikRoutes(connection)._list_ipv6_routes_cli()
+    
+    assert connection.commands == [
+        ':foreach i in=[/ipv6 route find] do={ :local r [/ipv6 route get $i]; '
+        ':put ("$i\\t" . ($r->"dst-address") . "\\t" . ($r->"gateway") . "\\t" . '
+        '($r->"distance") . "\\t" . ($r->"comment")) }'
+    ]
+    assert routes == [
+        Route('*1', '', '::/0', '2804:385c:8700::12', '1', 'Default-via-L2TP'),
+        Route('*2', '', '2804:385c:8700::14/126', '2804:385c:8700::12', '1', 'Route-CAETITE'),
+        Route('*3', '', '2804:385c:8700::1c/126', '2804:385c:8700::1a', '2', ''),
+    ]
+
+
+def test_list_routes_cli_filters_on_device():
+    connection = FakeConnection(listing=ROUTE_RECORDS.splitlines()[0])
+    
+    routes = MikrotikRoutes(connection)._list_ipv6_routes_cli('::/0')
+    
+    assert connection.commands[0].startswith(':foreach i in=[/ipv6 route find where dst-address=::/0] do={')
+    assert [route.dst_address for route in routes] == ['::/0']
+
+
+def test_list_routes_cli_ignores_stray_lines():
+    # Linhas fora do formato (ex: aviso do terminal) não viram rotas
+    output = "interrupted\r\n" + ROUTE_RECORDS
+    
+    assert len(MikrotikRoutes(FakeConnection(listing=output))._list_ipv6_routes_cli()) == 3
+
+
+def test_bulk_routes_skips_existing_routes():
+    connection = FakeConnection(listing=ROUTE_RECORDS)
+    
+    assert MikrotikRoutes(connection).bulk_configure_routes(ROUTE_CONFIGS) == (2, 0)
+    assert connection.batches == [[
+        '/ipv6 route add dst-address=2804:385c:8700::18/126 gateway=2804:385c:8700::16 '
+        'distance=1 check-gateway=ping comment="BRUMADO"'
+    ]] 
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""Canal shell persistente: marcadores __END_N__ e without-paging"""
+
+import socket
+
+import pytest
+
+# modules/__init__ importa o paramiko; sem ele não há o que testar
+pytest.importorskip("paramiko")
+
+from modules.mikrotik_connection import MikrotikConnection
+
+
+class FakeShell:
+    """Canal shell que entrega respostas pré-gravadas em blocos arbitrários"""
+    
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.sent = []
+        self.closed = False
+    
+    def send(self, data: str):
+        self.sent.append(data)
+    
+    def settimeout(self, timeout: float):
+        pass
+    
+    def recv(self, size: int) -> bytes:
+        if not self.chunks:
+            raise socket.timeout("sem dados")
+        return self.chunks.pop(0)
+    
+    def close(self):
+        self.closed = True
+
+
+def _shell_connection(chunks):
+    connection = MikrotikConnection('admin', 'secret')
+    connection._shell = FakeShell(chunks)
+    return connection
+
+
+def test_shell_command_strips_echo_and_prompt():
+    # Saída capturada do PTY: eco, escapes ANSI, marcador dividido entre leituras
+    connection = _shell_connection([
+        b'/system identity print without-paging\r\n  name: MikroTik\r\n',
+        b'[admin@MikroTik] > \x1b[K:put ("__END_" . "0__")\r\n__EN',
+        b'D_0__\r\n[admin@MikroTik] > ',
+    ])
+    
+    assert connection._execute_shell_command('/system identity print', 5) == '  name: MikroTik'
+    assert connection._shell.sent == ['/system identity print without-paging\n:put ("__END_" . "0__")\n']
+    assert connection._shell_pending == bytearray(b'\r\n[admin@MikroTik] > ')
+
+
+def test_shell_marker_from_previous_command_is_not_reused():
+    # Saída atrasada de um comando anterior fica no buffer e não encerra o próximo
+    connection = _shell_connection([b'old\r\n__END_0__\r\nnew\r\n__END_1__'])
+    
+    assert connection._execute_shell_command(':put old', 5) == 'old'
+    assert connection._execute_shell_command(':put new', 5) == 'new'
+
+
+def test_shell_timeout_closes_shell():
+    connection = _shell_connection([b'partial output without marker'])
+    shell = connection._shell
+    
+    with pytest.raises(socket.timeout):
+        connection._execute_shell_command(':put 1', 5)
+    
+    assert shell.closed
+    assert connection._shell is None
+
+
+@pytest.mark.parametrize('command, expected', [
+    ('/ipv6 route print', '/ipv6 route print without-paging'),
+    ('/ipv6 route print where dst-address=::/0', '/ipv6 route print without-paging where dst-address=::/0'),
+    ('/interface l2tp-server print', '/interface l2tp-server print without-paging'),
+    ('/ipv6 route print without-paging', '/ipv6 route print without-paging'),
+    (':put [/ipv6 route find]', ':put [/ipv6 route find]'),
+    ('/ipv6 address print count-only', '/ipv6 address print without-paging count-only'),
+])
+def test_without_paging(command, expected):
+    assert MikrotikConnection('admin', 'secret')._without_paging(command) == expected 
+
+def test_shell_batch_demuxes_outputs():
+    # Eco dos comandos após o prompt, saídas e marcadores divididos em blocos como chegam do PTY
+    connection = _shell_connection([
+        b'/ipv6 address print without-paging count-only\r\n3\r\n[admin@MikroTik] > :put ("__END_" . "0__")\r\n__EN',
+        b'D_0__\r\n[admin@MikroTik] > \x1b[K/system identity print without-paging\r\n  name: MikroTik\r\n',
+        b'[admin@MikroTik] > :put ("__END_" . "1__")\r\n__END_1__\r\n[admin@MikroTik] > ',
+    ])
+    
+    outputs = connection._execute_shell_batch(['/ipv6 address print count-only', '/system identity print'], 5)
+    
+    assert outputs == ['3', '  name: MikroTik']
+    assert connection._shell_pending == bytearray(b'\r\n[admin@MikroTik] > ')
+
+
+def test_shell_batch_sends_single_write_with_markers():
+    connection = _shell_connection([b'__END_0____END_1__'])
+    
+    assert connection._execute_shell_batch([':put 1', ':put 2'], 5) == ['', '']
+    assert connection._shell.sent == [
+        ':put 1\n:put ("__END_" . "0__")\n'
+        ':put 2\n:put ("__END_" . "1__")\n'
+    ]
+
+
+def test_shell_batch_timeout_fails_whole_batch():
+    # Primeiro comando completo, segundo sem marcador: o canal é descartado
+    connection = _shell_connection([b'1\r\n__END_0__\r\n2\r\n'])
+    
+    with pytest.raises(socket.timeout):
+        connection._execute_shell_batch([':put 1', ':put 2'], 5)
+    
+    assert connection._shell is None 
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""Cliente Telnet sobre asyncio: negociação de opções (IAC) e leitura até o marcador"""
+
+import asyncio
+
+import pytest
+
+# modules/__init__ importa o paramiko; sem ele não há o que testar
+pytest.importorskip("paramiko")
+
+from modules.mikrotik_connection import (
+    MikrotikConnection, _TelnetProtocol, _TelnetSession, _IAC, _DO, _DONT, _WILL, _WONT, _SB, _SE
+)
+
+_ECHO, _SGA, _NAWS = 1, 3, 31
+
+
+class FakeTransport:
+    """Transporte asyncio que registra o que foi escrito e, opcionalmente, responde"""
+    
+    def __init__(self, reply=None):
+        self.written = []
+        self.reply = reply
+        self.protocol = None
+    
+    def write(self, data: bytes):
+        self.written.append(data)
+        if self.reply:
+            self.protocol.data_received(self.reply)
+    
+    def close(self):
+        self.protocol.connection_lost(None)
+
+
+def _protocol(reply=None):
+    protocol = _TelnetProtocol()
+    transport = FakeTransport(reply)
+    transport.protocol = protocol
+    protocol.connection_made(transport)
+    return protocol
+
+
+def test_telnet_refuses_options():
+    protocol = _protocol()
+    protocol.data_received(bytes((_IAC, _DO, _ECHO, _IAC, _WILL, _SGA)) + b"Login: ")
+    
+    assert bytes(protocol.buffer) == b"Login: "
+    assert protocol.transport.written == [bytes((_IAC, _WONT, _ECHO)), bytes((_IAC, _DONT, _SGA))]
+
+
+def test_telnet_ignores_dont_and_wont():
+    protocol = _protocol()
+    protocol.data_received(bytes((_IAC, _DONT, _ECHO, _IAC, _WONT, _SGA)) + b"ok")
+    
+    assert bytes(protocol.buffer) == b"ok"
+    assert protocol.transport.written == []
+
+
+def test_telnet_escaped_iac_is_data():
+    protocol = _protocol()
+    protocol.data_received(b"a" + bytes((_IAC, _IAC)) + b"b")
+    
+    assert bytes(protocol.buffer) == b"a\xffb"
+
+
+def test_telnet_subnegotiation_is_skipped():
+    protocol = _protocol()
+    protocol.data_received(b"x" + bytes((_IAC, _SB, _NAWS, 0, 80, 0, 24, _IAC, _SE)) + b"y")
+    
+    assert bytes(protocol.buffer) == b"xy"
+
+
+def test_telnet_command_split_across_packets():
+    protocol = _protocol()
+    protocol.data_received(b"Pass" + bytes((_IAC,)))
+    protocol.data_received(bytes((_DO,)))
+    protocol.data_received(bytes((_ECHO,)) + b"word: ")
+    
+    assert bytes(protocol.buffer) == b"Password: "
+    assert protocol.transport.written == [bytes((_IAC, _WONT, _ECHO))]
+
+
+def test_telnet_subnegotiation_split_across_packets():
+    protocol = _protocol()
+    protocol.data_received(bytes((_IAC, _SB, _NAWS, 0, 80)))
+    protocol.data_received(bytes((0, 24, _IAC, _SE)) + b"ok")
+    
+    assert bytes(protocol.buffer) == b"ok"
+
+
+def test_telnet_read_until_marker_keeps_remainder():
+    async def scenario():
+        protocol = _protocol()
+        protocol.data_received(b"out\r\n__END_0__\r\n[admin@MikroTik] > ")
+        return await protocol.read_until(b"__END_0__", 1), bytes(protocol.buffer)
+    
+    data, remainder = asyncio.run(scenario())
+    
+    assert data == b"out\r\n__END_0__"
+    assert remainder == b"\r\n[admin@MikroTik] > "
+
+
+def test_telnet_read_until_eof_returns_partial():
+    async def scenario():
+        protocol = _protocol()
+        protocol.data_received(b"partial")
+        protocol.connection_lost(None)
+        return await protocol.read_until(b"__END_0__", 1)
+    
+    assert asyncio.run(scenario()) == b"partial"
+
+
+def test_telnet_command_reads_until_marker():
+    # Resposta capturada do console: eco do comando, saída, marcador e prompt
+    protocol = _protocol(reply=(
+        b'/system identity print without-paging\r\n  name: MikroTik\r\n'
+        b'[admin@MikroTik] > :put ("__END_" . "0__")\r\n__END_0__\r\n[admin@MikroTik] > '
+    ))
+    connection = MikrotikConnection('admin', 'secret')
+    connection.connection = _TelnetSession(asyncio.new_event_loop(), protocol)
+    
+    try:
+        assert connection._execute_telnet_command('/system identity print', 5) == '  name: MikroTik'
+        assert protocol.transport.written == [b'/system identity print without-paging\n:put ("__END_" . "0__")\n']
+    finally:
+        connection.connection.close() 
+
+def test_telnet_drain_discards_pending_data():
+    protocol = _protocol()
+    session = _TelnetSession(asyncio.new_event_loop(), protocol)
+    protocol.data_received(b"[admin@MikroTik] > ")
+    
+    try:
+        session.drain()
+        assert bytes(protocol.buffer) == b""
+        assert not session.closed
+    finally:
+        session.close()
+
+
+def test_telnet_drain_after_close_does_not_raise():
+    # Conexão encerrada pelo dispositivo: drain não levanta, closed sinaliza
+    protocol = _protocol()
+    session = _TelnetSession(asyncio.new_event_loop(), protocol)
+    protocol.data_received(b"bye")
+    protocol.connection_lost(None)
+    
+    try:
+        session.drain()
+        assert session.closed
+    finally:
+        session.close()
+
+
+def test_telnet_command_on_closed_connection_raises_eof():
+    protocol = _protocol()
+    protocol.connection_lost(None)
+    connection = MikrotikConnection('admin', 'secret')
+    connection.connection = _TelnetSession(asyncio.new_event_loop(), protocol)
+    
+    try:
+        with pytest.raises(EOFError):
+            connection._execute_telnet_command(':put 1', 5)
+        assert protocol.transport.written == []
+    finally:
+        connection.connection.close() 
\ No newline at end of file